@@ -96,13 +96,26 @@ def part2(ranges: list[IdRange], available_ids: list[int] | None = None) -> int:
     return sum(r.end - r.start + 1 for r in merged)
 
 
+def solve_part1(parsed: tuple[list[IdRange], list[int]]) -> int:
+    """Part 1 from the output of ``parse_input``."""
+
+    return part1(*parsed)
+
+
+def solve_part2(parsed: tuple[list[IdRange], list[int]]) -> int:
+    """Part 2 from the output of ``parse_input``."""
+
+    ranges, _ = parsed
+    return part2(ranges)
+
+
 def run(variant: str | None = None) -> None:
     """Run day05 solution and print results."""
 
     lines = read_input_lines(YEAR, DAY, variant)
-    ranges, ids = parse_input(lines)
-    print(f"Part 1: {part1(ranges, ids)}")
-    print(f"Part 2: {part2(ranges)}")
+    parsed = parse_input(lines)
+    print(f"Part 1: {solve_part1(parsed)}")
+    print(f"Part 2: {solve_part2(parsed)}")
 
 
 if __name__ == "__main__":
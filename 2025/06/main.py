@@ -150,13 +150,26 @@ def part2(lines: list[str]) -> int:
     return part1(problems)
 
 
+def prepare(lines: list[str]) -> tuple[list[Problem], list[str]]:
+    """Parse the row-wise problems and keep the raw lines for part 2."""
+
+    return parse_input(lines), lines
+
+
+def solve_part1(prepared: tuple[list[Problem], list[str]]) -> int:
+    return part1(prepared[0])
+
+
+def solve_part2(prepared: tuple[list[Problem], list[str]]) -> int:
+    return part2(prepared[1])
+
+
 def run(variant: str | None = None) -> None:
     """Run day06 solution and print results."""
 
-    lines = read_input_lines(YEAR, DAY, variant)
-    problems_lr = parse_input(lines)
-    print(f"Part 1: {part1(problems_lr)}")
-    print(f"Part 2: {part2(lines)}")
+    prepared = prepare(read_input_lines(YEAR, DAY, variant))
+    print(f"Part 1: {solve_part1(prepared)}")
+    print(f"Part 2: {solve_part2(prepared)}")
 
 
 if __name__ == "__main__":
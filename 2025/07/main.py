@@ -1,109 +1,150 @@
 from __future__ import annotations
 
-from utils.io import read_input_lines
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass
+from typing import Iterable
+
+from utils.io import iter_input_lines
 
 YEAR = 2025
 DAY = 7
 
 
-def _prepare_grid(lines: list[str]) -> tuple[list[str], tuple[int, int]]:
-    """Pad the grid to uniform width and locate the start position.
+@dataclass(frozen=True)
+class Manifold:
+    """Sparse view of a manifold diagram.
 
-    Missing characters at the end of a row are treated as empty space (`.`).
-    Returns the padded grid and the (row, col) of `S`.
+    Only the splitters are kept: ``splitters`` maps a column to the sorted rows
+    holding a `^` in that column. ``width`` is the length of the longest row;
+    shorter rows are implicitly padded with empty space.
     """
 
-    if not lines:
-        raise ValueError("Input is empty; expected a manifold diagram.")
+    start: tuple[int, int]
+    width: int
+    splitters: dict[int, list[int]]
 
-    width = max(len(line) for line in lines)
-    grid = [line.ljust(width, ".") for line in lines]
 
-    start_row = start_col = None
-    for r, row in enumerate(grid):
-        if "S" in row:
-            start_row = r
-            start_col = row.index("S")
-            break
+def parse_input(lines: Iterable[str]) -> Manifold:
+    """Index the splitters of a diagram, consuming ``lines`` once.
+
+    Rows are never padded or stored, so ``lines`` can be a lazy iterator over a
+    file. Missing characters at the end of a row are treated as empty space.
+    """
 
-    if start_row is None or start_col is None:
+    start: tuple[int, int] | None = None
+    width = 0
+    splitters: dict[int, list[int]] = {}
+    seen_rows = False
+
+    for r, line in enumerate(lines):
+        seen_rows = True
+        width = max(width, len(line))
+        if start is None:
+            c = line.find("S")
+            if c >= 0:
+                start = (r, c)
+        c = line.find("^")
+        while c >= 0:
+            # Rows arrive in order, so each column list stays sorted.
+            splitters.setdefault(c, []).append(r)
+            c = line.find("^", c + 1)
+
+    if not seen_rows:
+        raise ValueError("Input is empty; expected a manifold diagram.")
+    if start is None:
         raise ValueError("No start position 'S' found in the diagram.")
 
-    return grid, (start_row, start_col)
+    return Manifold(start, width, splitters)
 
 
-def count_splits(lines: list[str]) -> int:
-    """Count how many times beams are split while traversing the manifold.
+def _next_splitter(manifold: Manifold, row: int, col: int) -> int | None:
+    """Return the first splitter row at or below ``row`` in ``col``."""
 
-    Beams always move downward. When a beam encounters a splitter (`^`), that
-    beam stops and two new beams emerge from the immediate left and right of
-    the splitter. Beams travelling through empty space (`.`) continue
-    downward. Multiple beams may overlap; overlapping beams are treated as a
-    single beam path for the purposes of further propagation.
-    """
+    rows = manifold.splitters.get(col)
+    if not rows:
+        return None
+    i = bisect_left(rows, row)
+    return rows[i] if i < len(rows) else None
+
+
+def _propagate(manifold: Manifold) -> tuple[int, int]:
+    """Follow the beams from splitter to splitter.
 
-    grid, (start_row, start_col) = _prepare_grid(lines)
-    rows = len(grid)
-    width = len(grid[0])
+    Returns ``(splits, timelines)``: the number of distinct splitters hit and
+    the number of quantum timelines that leave the bottom of the manifold.
+    Splitters are processed in row order, so every splitter has received all of
+    its incoming timelines before it fans them out. Work is proportional to the
+    number of splitters reached rather than to the size of the grid.
+    """
 
-    active: set[int] = {start_col}  # columns with beams entering the current row
+    start_row, start_col = manifold.start
+    pending: dict[tuple[int, int], int] = {}  # splitter -> incoming timelines
+    queue: list[tuple[int, int]] = []
     splits = 0
+    timelines = 0
 
-    for r in range(start_row, rows):
-        next_row: set[int] = set()
+    def send(row: int, col: int, count: int) -> None:
+        nonlocal timelines
+        if not 0 <= col < manifold.width:
+            return
+        hit = _next_splitter(manifold, row, col)
+        if hit is None:
+            timelines += count
+            return
+        key = (hit, col)
+        if key not in pending:
+            pending[key] = 0
+            heapq.heappush(queue, key)
+        pending[key] += count
 
-        for c in active:
-            cell = grid[r][c]
-            if cell == "^":
-                splits += 1
-                for nc in (c - 1, c + 1):
-                    if 0 <= nc < width:
-                        next_row.add(nc)
-            else:
-                next_row.add(c)
+    # The start cell itself never splits, so the beam enters the row below it.
+    send(start_row + 1, start_col, 1)
 
-        active = next_row
-        if not active:
-            break
+    while queue:
+        row, col = heapq.heappop(queue)
+        count = pending.pop((row, col))
+        splits += 1
+        send(row + 1, col - 1, count)
+        send(row + 1, col + 1, count)
 
-    return splits
+    return splits, timelines
 
 
-def part1(lines: list[str]) -> int:
-    return count_splits(lines)
+def _as_manifold(data: Iterable[str] | Manifold) -> Manifold:
+    return data if isinstance(data, Manifold) else parse_input(data)
+
+
+def count_splits(lines: Iterable[str] | Manifold) -> int:
+    """Count how many times beams are split while traversing the manifold.
+
+    Beams always move downward. When a beam encounters a splitter (`^`), that
+    beam stops and two new beams emerge from the immediate left and right of
+    the splitter. Beams travelling through empty space (`.`) continue
+    downward. Multiple beams may overlap; overlapping beams are treated as a
+    single beam path for the purposes of further propagation.
+    """
 
+    return _propagate(_as_manifold(lines))[0]
 
-def part2(lines: list[str]) -> int:
-    grid, (start_row, start_col) = _prepare_grid(lines)
-    rows = len(grid)
-    width = len(grid[0])
 
-    active: dict[int, int] = {start_col: 1}  # columns -> timeline count
+def part1(lines: Iterable[str] | Manifold) -> int:
+    return count_splits(lines)
 
-    for r in range(start_row, rows):
-        next_row: dict[int, int] = {}
 
-        for c, count in active.items():
-            cell = grid[r][c]
-            if cell == "^":
-                for nc in (c - 1, c + 1):
-                    if 0 <= nc < width:
-                        next_row[nc] = next_row.get(nc, 0) + count
-            else:
-                next_row[c] = next_row.get(c, 0) + count
+def part2(lines: Iterable[str] | Manifold) -> int:
+    """Count the timelines that leave the bottom of the manifold.
 
-        active = next_row
-        if not active:
-            break
+    Unlike part 1, timelines that meet in the same column are not merged.
+    """
 
-    # Timelines that leave the bottom of the grid.
-    return sum(active.values())
+    return _propagate(_as_manifold(lines))[1]
 
 
 def run(variant: str | None = None) -> None:
-    lines = read_input_lines(YEAR, DAY, variant)
-    print(f"Part 1: {part1(lines)}")
-    print(f"Part 2: {part2(lines)}")
+    manifold = parse_input(iter_input_lines(YEAR, DAY, variant))
+    print(f"Part 1: {part1(manifold)}")
+    print(f"Part 2: {part2(manifold)}")
 
 
 if __name__ == "__main__":
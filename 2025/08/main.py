@@ -1,51 +1,60 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable
+import heapq
+from collections import Counter
+from itertools import islice
+from typing import Callable, Iterable, Iterator
 
+import numpy as np
 from utils.io import read_input_lines
+from utils.union_find import DisjointSet, top_sizes
 
 YEAR = 2025
 DAY = 8
 
 Point3D = tuple[int, int, int]
 DistanceFn = Callable[[Point3D, Point3D], int]
+Edge = tuple[int, int, int]  # (distance, i, j) with i < j
 
 
-@dataclass(frozen=True)
 class CircuitResult:
-    sizes: list[int]
+    """Circuit sizes after connecting pairs, held as a ``size -> count`` histogram.
+
+    Pass the sizes, the histogram, or both. ``sizes`` lists every circuit and
+    is only built from the histogram when first read, so answering from
+    ``top_three_product`` never materialises one entry per circuit.
+    """
+
+    def __init__(
+        self, sizes: Iterable[int] | None = None, size_counts: dict[int, int] | None = None
+    ):
+        if sizes is not None:
+            sizes = list(sizes)
+            if size_counts is None:
+                size_counts = dict(Counter(sizes))
+        self._sizes = sizes
+        self.size_counts = size_counts if size_counts is not None else {}
+
+    @property
+    def sizes(self) -> list[int]:
+        if self._sizes is None:
+            self._sizes = top_sizes(self.size_counts, sum(self.size_counts.values()))
+        return self._sizes
 
     @property
     def top_three_product(self) -> int:
-        top = sorted(self.sizes, reverse=True)
+        top = top_sizes(self.size_counts, 3)
         while len(top) < 3:
             top.append(1)
         return top[0] * top[1] * top[2]
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CircuitResult):
+            return NotImplemented
+        return self.size_counts == other.size_counts
 
-class DisjointSet:
-    def __init__(self, n: int):
-        self.parent = list(range(n))
-        self.size = [1] * n
-
-    def find(self, x: int) -> int:
-        while self.parent[x] != x:
-            self.parent[x] = self.parent[self.parent[x]]
-            x = self.parent[x]
-        return x
-
-    def union(self, a: int, b: int) -> None:
-        ra, rb = self.find(a), self.find(b)
-        if ra == rb:
-            return
-        if self.size[ra] < self.size[rb]:
-            ra, rb = rb, ra
-        self.parent[rb] = ra
-        self.size[ra] += self.size[rb]
-
-    def component_sizes(self) -> list[int]:
-        return [self.size[i] for i in range(len(self.parent)) if self.parent[i] == i]
+    def __repr__(self) -> str:
+        return f"CircuitResult(size_counts={self.size_counts!r})"
 
 
 def parse_input(lines: list[str]) -> list[Point3D]:
@@ -75,8 +84,8 @@ def manhattan(a: Point3D, b: Point3D) -> int:
     return abs(a[0] - b[0]) + abs(a[1] - b[1]) + abs(a[2] - b[2])
 
 
-def _sorted_edges(points: list[Point3D], distance: DistanceFn) -> list[tuple[int, int, int]]:
-    edges: list[tuple[int, int, int]] = []  # (distance, i, j)
+def _sorted_edges(points: list[Point3D], distance: DistanceFn) -> list[Edge]:
+    edges: list[Edge] = []
     for i in range(len(points)):
         pi = points[i]
         for j in range(i + 1, len(points)):
@@ -85,6 +94,193 @@ def _sorted_edges(points: list[Point3D], distance: DistanceFn) -> list[tuple[int
     return edges
 
 
+# Metrics whose value never decreases when any coordinate gap grows. For these
+# the distance from a point to a box (or to a cell a few grid steps away) is
+# bounded below by the distance from the origin to the per-axis gaps.
+_SPATIAL_METRICS: tuple[DistanceFn, ...] = (squared_euclidean, manhattan)
+
+
+class _PointGrid:
+    """Uniform bucketing of 3D points into cubic cells of side ``cell``.
+
+    The cell size is chosen so that the grid has roughly one cell per point.
+    """
+
+    def __init__(self, points: list[Point3D]):
+        self.origin = tuple(min(p[axis] for p in points) for axis in range(3))
+        extent = max(max(p[axis] for p in points) - self.origin[axis] + 1 for axis in range(3))
+        per_axis = max(1, round(len(points) ** (1 / 3)))
+        self.cell = max(1, -(-extent // per_axis))
+        self.cells: dict[tuple[int, int, int], list[int]] = {}
+        for idx, p in enumerate(points):
+            self.cells.setdefault(self.cell_of(p), []).append(idx)
+        self.dims = tuple(max(key[axis] for key in self.cells) + 1 for axis in range(3))
+
+    def cell_of(self, p: Point3D) -> tuple[int, int, int]:
+        ox, oy, oz = self.origin
+        c = self.cell
+        return ((p[0] - ox) // c, (p[1] - oy) // c, (p[2] - oz) // c)
+
+    def shell(self, center: tuple[int, int, int], r: int) -> Iterator[list[int]]:
+        """Yield the occupied cells at Chebyshev distance exactly ``r``."""
+
+        cx, cy, cz = center
+        gx, gy, gz = self.dims
+        cells = self.cells
+        for x in range(max(cx - r, 0), min(cx + r, gx - 1) + 1):
+            x_edge = abs(x - cx) == r
+            for y in range(max(cy - r, 0), min(cy + r, gy - 1) + 1):
+                if x_edge or abs(y - cy) == r:
+                    zs = range(max(cz - r, 0), min(cz + r, gz - 1) + 1)
+                else:
+                    zs = [z for z in (cz - r, cz + r) if 0 <= z < gz]
+                for z in zs:
+                    bucket = cells.get((x, y, z))
+                    if bucket is not None:
+                        yield bucket
+
+    def max_shell(self, center: tuple[int, int, int]) -> int:
+        return max(max(c, d - 1 - c) for c, d in zip(center, self.dims))
+
+
+def _later_neighbours(
+    points: list[Point3D], grid: _PointGrid, i: int, distance: DistanceFn
+) -> Iterator[tuple[int, int]]:
+    """Yield ``(distance, j)`` for every ``j > i`` in increasing order.
+
+    Shells of grid cells are scanned outward from the cell of point ``i``. A
+    candidate is only released once no unscanned shell can hold a closer (or
+    equally close but lower-indexed) point.
+    """
+
+    p = points[i]
+    center = grid.cell_of(p)
+    found: list[tuple[int, int]] = []
+    for r in range(grid.max_shell(center) + 1):
+        for bucket in grid.shell(center, r):
+            for j in bucket:
+                if j > i:
+                    heapq.heappush(found, (distance(p, points[j]), j))
+        # Points beyond shell r are more than r whole cells away along one axis.
+        gap = r * grid.cell + 1
+        bound = distance((0, 0, 0), (gap, 0, 0))
+        while found and found[0][0] < bound:
+            yield heapq.heappop(found)
+    while found:
+        yield heapq.heappop(found)
+
+
+def _closest_pairs(points: list[Point3D], distance: DistanceFn) -> Iterator[Edge]:
+    """Lazily yield ``(distance, i, j)`` edges in the order of ``_sorted_edges``.
+
+    For the built-in metrics every point streams its later neighbours from a
+    uniform grid and the streams are merged, so taking the first ``k`` edges
+    costs roughly ``O(n + k)`` distance evaluations instead of ``O(n^2)``.
+    Other distance functions fall back to sorting every pair.
+    """
+
+    if distance not in _SPATIAL_METRICS:
+        yield from _sorted_edges(points, distance)
+        return
+    if len(points) < 2:
+        return
+
+    grid = _PointGrid(points)
+
+    def stream(i: int) -> Iterator[Edge]:
+        for d, j in _later_neighbours(points, grid, i, distance):
+            yield d, i, j
+
+    yield from heapq.merge(*(stream(i) for i in range(len(points) - 1)))
+
+
+def _squared_euclidean_tile(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Squared Euclidean distances between the rows of ``a`` and ``b``."""
+
+    out = np.zeros((len(a), len(b)), dtype=np.int64)
+    for axis in range(3):
+        diff = a[:, axis, None] - b[None, :, axis]
+        out += diff * diff
+    return out
+
+
+def _manhattan_tile(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Manhattan distances between the rows of ``a`` and ``b``."""
+
+    out = np.zeros((len(a), len(b)), dtype=np.int64)
+    for axis in range(3):
+        out += np.abs(a[:, axis, None] - b[None, :, axis])
+    return out
+
+
+# Vectorised counterparts of the built-in metrics, computing int64 tiles.
+_TILE_KERNELS: dict[DistanceFn, Callable[[np.ndarray, np.ndarray], np.ndarray]] = {
+    squared_euclidean: _squared_euclidean_tile,
+    manhattan: _manhattan_tile,
+}
+
+# Upper bound on the number of distances held in one tile.
+_TILE_SIZE = 1 << 21
+
+# Up to this many points, scanning every pair in NumPy tiles beats the grid.
+_BLOCKED_MAX_POINTS = 6_000
+
+
+def _smallest_edges(
+    d: np.ndarray, i: np.ndarray, j: np.ndarray, k: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Keep the ``k`` smallest ``(d, i, j)`` keys, sorted."""
+
+    if len(d) > k:
+        kth = np.partition(d, k - 1)[k - 1]
+        keep = d <= kth
+        d, i, j = d[keep], i[keep], j[keep]
+    order = np.lexsort((j, i, d))[:k]
+    return d[order], i[order], j[order]
+
+
+def _closest_pairs_blocked(points: list[Point3D], k: int, distance: DistanceFn) -> list[Edge]:
+    """Return the ``k`` smallest edges in ``_sorted_edges`` order using NumPy tiles.
+
+    Rows are processed in blocks against every later point. Each tile is cut
+    down to its ``k`` best candidates with ``np.partition`` and merged into a
+    running top-k, so the full distance matrix is never held in memory.
+    """
+
+    n = len(points)
+    if k == 0 or n < 2:
+        return []
+
+    kernel = _TILE_KERNELS[distance]
+    coords = np.asarray(points, dtype=np.int64).reshape(n, 3)
+    block = max(1, _TILE_SIZE // n)
+    empty = np.empty(0, dtype=np.int64)
+    top_d, top_i, top_j = empty, empty, empty
+
+    for start in range(0, n - 1, block):
+        stop = min(start + block, n - 1)
+        tile = kernel(coords[start:stop], coords[start + 1 :])
+        rows, cols = tile.shape
+        # Entry (r, c) is the pair (start + r, start + 1 + c); keep j > i only.
+        valid = np.arange(rows)[:, None] <= np.arange(cols)[None, :]
+        flat = tile[valid]
+        flat_idx = np.flatnonzero(valid)
+        if len(flat) > k:
+            kth = np.partition(flat, k - 1)[k - 1]
+            keep = flat <= kth
+            flat, flat_idx = flat[keep], flat_idx[keep]
+        ii = start + flat_idx // cols
+        jj = start + 1 + flat_idx % cols
+        top_d, top_i, top_j = _smallest_edges(
+            np.concatenate((top_d, flat)),
+            np.concatenate((top_i, ii)),
+            np.concatenate((top_j, jj)),
+            k,
+        )
+
+    return list(zip(top_d.tolist(), top_i.tolist(), top_j.tolist()))
+
+
 def connect_closest(
     points: list[Point3D],
     pairs_to_connect: int,
@@ -98,41 +294,297 @@ def connect_closest(
     if pairs_to_connect < 0:
         raise ValueError("pairs_to_connect cannot be negative")
 
-    edges = _sorted_edges(points, distance)
+    if distance in _TILE_KERNELS and n <= _BLOCKED_MAX_POINTS:
+        edges: Iterable[Edge] = _closest_pairs_blocked(points, pairs_to_connect, distance)
+    else:
+        edges = islice(_closest_pairs(points, distance), pairs_to_connect)
 
-    limit = min(pairs_to_connect, len(edges))
     dsu = DisjointSet(n)
-    for _, i, j in edges[:limit]:
+    for _, i, j in edges:
         dsu.union(i, j)
 
-    return CircuitResult(dsu.component_sizes())
+    return CircuitResult(size_counts=dsu.size_histogram())
 
 
-def last_connection_product(points: list[Point3D], distance: DistanceFn) -> int:
-    """Return the product of X coordinates of the edge that finishes connectivity.
+def _distance_row(
+    points: list[Point3D], coords: np.ndarray, u: int, distance: DistanceFn
+) -> np.ndarray:
+    """Return the distances from point ``u`` to every point as an int64 array."""
 
-    Edges are considered in order of increasing distance; the first edge that
-    reduces the circuit count to 1 determines the answer.
+    kernel = _TILE_KERNELS.get(distance)
+    if kernel is not None:
+        return kernel(coords[u : u + 1], coords)[0]
+    pu = points[u]
+    return np.fromiter((distance(pu, q) for q in points), dtype=np.int64, count=len(points))
+
+
+def _mst_prim(points: list[Point3D], distance: DistanceFn) -> list[Edge]:
+    """Dense Prim's algorithm: ``O(n^2)`` time and ``O(n)`` memory.
+
+    Edges are compared by their full ``(distance, i, j)`` key, so ties are
+    resolved exactly as in the sorted edge list.
     """
 
     n = len(points)
-    if n < 2:
-        return 0
+    coords = np.asarray(points, dtype=np.int64).reshape(n, 3)
+    idx = np.arange(n)
+    unreached = np.iinfo(np.int64).max
+    in_tree = np.zeros(n, dtype=bool)
+    best_d = np.full(n, unreached, dtype=np.int64)
+    best_from = np.zeros(n, dtype=np.int64)
+
+    edges: list[Edge] = []
+    u = 0
+    for _ in range(n - 1):
+        in_tree[u] = True
+        row = _distance_row(points, coords, u, distance)
+        new_key = (row, np.minimum(idx, u), np.maximum(idx, u))
+        old_key = (best_d, np.minimum(idx, best_from), np.maximum(idx, best_from))
+        better = (new_key[0] < old_key[0]) | (
+            (new_key[0] == old_key[0])
+            & ((new_key[1] < old_key[1]) | ((new_key[1] == old_key[1]) & (new_key[2] < old_key[2])))
+        )
+        better &= ~in_tree
+        best_d[better] = row[better]
+        best_from[better] = u
+
+        candidates = np.where(in_tree, unreached, best_d)
+        d = candidates.min()
+        ties = np.flatnonzero(candidates == d)
+        if len(ties) > 1:
+            lo = np.minimum(ties, best_from[ties])
+            hi = np.maximum(ties, best_from[ties])
+            v = int(ties[np.lexsort((hi, lo))[0]])
+        else:
+            v = int(ties[0])
+        a = int(best_from[v])
+        edges.append((int(d), min(a, v), max(a, v)))
+        u = v
+    return edges
+
+
+class _KDTree:
+    """Static KD-tree over 3D points for nearest-foreign-neighbour queries.
+
+    Nodes are stored in flat lists in preorder, so every child has a larger
+    index than its parent.
+    """
 
-    edges = _sorted_edges(points, distance)
+    LEAF_SIZE = 16
+
+    def __init__(self, points: list[Point3D]):
+        self.points = points
+        self.order = list(range(len(points)))
+        self.lo: list[int] = []
+        self.hi: list[int] = []
+        self.left: list[int] = []
+        self.right: list[int] = []
+        self.axis: list[int] = []
+        self.split: list[int] = []
+        self.bmin: list[Point3D] = []
+        self.bmax: list[Point3D] = []
+        self._build(0, len(points))
+
+    def _build(self, lo: int, hi: int) -> int:
+        node = len(self.lo)
+        pts = [self.points[k] for k in self.order[lo:hi]]
+        bmin = (min(p[0] for p in pts), min(p[1] for p in pts), min(p[2] for p in pts))
+        bmax = (max(p[0] for p in pts), max(p[1] for p in pts), max(p[2] for p in pts))
+        self.lo.append(lo)
+        self.hi.append(hi)
+        self.left.append(-1)
+        self.right.append(-1)
+        self.axis.append(0)
+        self.split.append(0)
+        self.bmin.append(bmin)
+        self.bmax.append(bmax)
+        if hi - lo <= self.LEAF_SIZE:
+            return node
+
+        axis = max(range(3), key=lambda a: bmax[a] - bmin[a])
+        self.order[lo:hi] = sorted(self.order[lo:hi], key=lambda k: self.points[k][axis])
+        mid = (lo + hi) // 2
+        self.axis[node] = axis
+        self.split[node] = self.points[self.order[mid]][axis]
+        self.left[node] = self._build(lo, mid)
+        self.right[node] = self._build(mid, hi)
+        return node
+
+    def component_labels(self, comp: list[int]) -> list[int]:
+        """Label each node with the component shared by all its points, or -1."""
+
+        labels = [-1] * len(self.lo)
+        for node in reversed(range(len(self.lo))):
+            left = self.left[node]
+            if left >= 0:
+                label = labels[left]
+                labels[node] = label if label == labels[self.right[node]] else -1
+                continue
+            members = self.order[self.lo[node] : self.hi[node]]
+            label = comp[members[0]]
+            if all(comp[k] == label for k in members):
+                labels[node] = label
+        return labels
+
+    def nearest_foreign(
+        self,
+        i: int,
+        comp: list[int],
+        labels: list[int],
+        squared: bool,
+        bound: Edge | None,
+    ) -> Edge | None:
+        """Return the smallest edge key from ``i`` to another component.
+
+        ``squared`` selects squared Euclidean distance, otherwise Manhattan
+        distance is used; both are inlined because this is the hot loop. Only
+        keys smaller than ``bound`` are searched for; ``None`` means no such
+        edge exists.
+        """
+
+        points = self.points
+        order = self.order
+        bmin = self.bmin
+        bmax = self.bmax
+        px, py, pz = points[i]
+        ci = comp[i]
+        best = bound
+        best_d = bound[0] if bound is not None else -1
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if labels[node] == ci:
+                continue
+            if best_d >= 0:
+                mn = bmin[node]
+                mx = bmax[node]
+                gx = mn[0] - px if px < mn[0] else (px - mx[0] if px > mx[0] else 0)
+                gy = mn[1] - py if py < mn[1] else (py - mx[1] if py > mx[1] else 0)
+                gz = mn[2] - pz if pz < mn[2] else (pz - mx[2] if pz > mx[2] else 0)
+                gap = gx * gx + gy * gy + gz * gz if squared else gx + gy + gz
+                if gap > best_d:
+                    continue
+
+            left = self.left[node]
+            if left < 0:
+                for j in order[self.lo[node] : self.hi[node]]:
+                    if comp[j] == ci:
+                        continue
+                    qx, qy, qz = points[j]
+                    if squared:
+                        d = (qx - px) ** 2 + (qy - py) ** 2 + (qz - pz) ** 2
+                    else:
+                        d = abs(qx - px) + abs(qy - py) + abs(qz - pz)
+                    if 0 <= best_d < d:
+                        continue
+                    key = (d, i, j) if i < j else (d, j, i)
+                    if best is None or key < best:
+                        best = key
+                        best_d = d
+            elif (px, py, pz)[self.axis[node]] < self.split[node]:
+                stack.append(self.right[node])
+                stack.append(left)
+            else:
+                stack.append(left)
+                stack.append(self.right[node])
+
+        return None if best is bound else best
+
+
+def _mst_boruvka(points: list[Point3D], distance: DistanceFn) -> list[Edge]:
+    """Borůvka's algorithm with KD-tree nearest-foreign-neighbour searches.
+
+    Every round each component picks its smallest outgoing edge. A point's
+    nearest foreign neighbour stays valid until the two merge, because the set
+    of foreign points only shrinks, so most points are not searched again, and
+    points whose last known neighbour distance already exceeds their
+    component's best candidate are skipped.
+    Only the built-in metrics are supported.
+    """
+
+    n = len(points)
+    squared = distance is squared_euclidean
+    tree = _KDTree(points)
     dsu = DisjointSet(n)
-    components = n
+    nearest: list[Edge | None] = [None] * n
+    # Distance to the nearest foreign point never decreases between rounds.
+    lower = [0] * n
+    edges: list[Edge] = []
+
+    while len(edges) < n - 1:
+        comp = [dsu.find(i) for i in range(n)]
+        labels = tree.component_labels(comp)
+        best: dict[int, Edge] = {}
+
+        # Cheap candidates first, so later points can often skip the search.
+        for i in sorted(range(n), key=lower.__getitem__):
+            ci = comp[i]
+            bound = best.get(ci)
+            cached = nearest[i]
+            if cached is None or comp[cached[1]] == comp[cached[2]]:
+                if bound is not None and lower[i] > bound[0]:
+                    continue
+                # A result found below the component bound is the true nearest.
+                cached = tree.nearest_foreign(i, comp, labels, squared, bound)
+                nearest[i] = cached
+                if cached is None:
+                    continue
+                lower[i] = cached[0]
+            if bound is None or cached < bound:
+                best[ci] = cached
+
+        for edge in sorted(best.values()):
+            if dsu.union(edge[1], edge[2]):
+                edges.append(edge)
 
-    for _, i, j in edges:
-        ri, rj = dsu.find(i), dsu.find(j)
-        if ri == rj:
-            continue
-        dsu.union(ri, rj)
-        components -= 1
-        if components == 1:
-            return points[i][0] * points[j][0]
+    return edges
+
+
+# Dense Prim's is faster than the tree search up to a few thousand points.
+_PRIM_MAX_POINTS = 4000
+
+
+def minimum_spanning_tree(
+    points: list[Point3D], distance: DistanceFn, method: str = "auto"
+) -> list[Edge]:
+    """Return the ``(distance, i, j)`` edges of the minimum spanning tree.
+
+    Edges are ordered by the same total order as ``_sorted_edges``, which makes
+    the tree unique and equal to the one Kruskal's algorithm builds from the
+    sorted edge list. ``method`` is ``"prim"``, ``"boruvka"`` or ``"auto"``.
+    """
+
+    if method == "auto":
+        if len(points) > _PRIM_MAX_POINTS and distance in _SPATIAL_METRICS:
+            method = "boruvka"
+        else:
+            method = "prim"
+    if method == "boruvka" and distance not in _SPATIAL_METRICS:
+        raise ValueError("Borůvka's method needs a built-in distance metric")
+    if method not in {"prim", "boruvka"}:
+        raise ValueError(f"Unknown MST method: {method!r}")
+
+    if len(points) < 2:
+        return []
+    if method == "prim":
+        return _mst_prim(points, distance)
+    return _mst_boruvka(points, distance)
+
+
+def last_connection_product(points: list[Point3D], distance: DistanceFn) -> int:
+    """Return the product of X coordinates of the edge that finishes connectivity.
+
+    Edges are considered in order of increasing distance; the first edge that
+    reduces the circuit count to 1 determines the answer. That edge is the
+    largest edge of the minimum spanning tree, which is found without sorting
+    all pairs.
+    """
+
+    if len(points) < 2:
+        return 0
 
-    raise ValueError("Graph did not fully connect; check input data")
+    _, i, j = max(minimum_spanning_tree(points, distance))
+    return points[i][0] * points[j][0]
 
 
 def part1(points: list[Point3D], pairs_to_connect: int = 1000) -> int:
@@ -1,7 +1,12 @@
 from __future__ import annotations
 
-from bisect import bisect_right
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass
+from itertools import pairwise
+from typing import Iterable
 
+import numpy as np
 from utils.io import read_input_lines
 
 YEAR = 2025
@@ -10,43 +15,6 @@ DAY = 9
 Point = tuple[int, int]
 
 
-def _point_on_segment(px: float, py: float, x1: float, y1: float, x2: float, y2: float) -> bool:
-    if x1 == x2 and y1 == y2:
-        return px == x1 and py == y1
-    if x1 == x2:  # vertical
-        if px != x1:
-            return False
-        return min(y1, y2) <= py <= max(y1, y2)
-    if y1 == y2:  # horizontal
-        if py != y1:
-            return False
-        return min(x1, x2) <= px <= max(x1, x2)
-    return False
-
-
-def _point_in_polygon(point: tuple[float, float], poly: list[Point]) -> bool:
-    """Return True if point is inside or on the boundary of the polygon."""
-
-    x, y = point
-    inside = False
-    n = len(poly)
-    for i in range(n):
-        x1, y1 = poly[i]
-        x2, y2 = poly[(i + 1) % n]
-
-        if _point_on_segment(x, y, x1, y1, x2, y2):
-            return True  # boundary is inside
-
-        if (y1 > y) != (y2 > y):
-            t = (y - y1) / (y2 - y1)
-            cross_x = x1 + t * (x2 - x1)
-            if cross_x == x:
-                return True
-            if cross_x > x:
-                inside = not inside
-    return inside
-
-
 def _make_bounds(coords: set[int]) -> list[float]:
     values = sorted(coords)
     bounds = {values[0] - 0.5, values[-1] + 0.5}
@@ -60,33 +28,165 @@ def _tile_index(value: int, bounds: list[float]) -> int:
     return bisect_right(bounds, value) - 1
 
 
-def _build_allowed_prefix(points: list[Point]) -> tuple[list[float], list[float], list[list[int]]]:
-    xs = _make_bounds({p[0] for p in points})
-    ys = _make_bounds({p[1] for p in points})
+def _index_map(values: Iterable[int], bounds: list[float]) -> dict[int, int]:
+    """Map each coordinate value to the compressed cell that contains it."""
 
-    widths = [int(round(xs[i + 1] - xs[i])) for i in range(len(xs) - 1)]
-    heights = [int(round(ys[j + 1] - ys[j])) for j in range(len(ys) - 1)]
+    return {v: _tile_index(v, bounds) for v in values}
 
-    prefix = [[0] * (len(ys)) for _ in range(len(xs))]
 
-    for i in range(len(xs) - 1):
-        sample_x = (xs[i] + xs[i + 1]) / 2.0
-        for j in range(len(ys) - 1):
-            sample_y = (ys[j] + ys[j + 1]) / 2.0
-            if _point_in_polygon((sample_x, sample_y), points):
-                tiles = widths[i] * heights[j]
-            else:
-                tiles = 0
+def _horizontal_edges(points: list[Point]) -> list[tuple[int, int, int]]:
+    """Return ``(xmin, xmax, y)`` for every horizontal polygon edge.
 
-            prefix[i + 1][j + 1] = tiles + prefix[i][j + 1] + prefix[i + 1][j] - prefix[i][j]
-        # carry top row accumulation for next i
-        prefix[i + 1][0] = 0
+    Raises ``ValueError`` for edges that are not axis-aligned.
+    """
 
-    return xs, ys, prefix
+    edges: list[tuple[int, int, int]] = []
+    n = len(points)
+    for k in range(n):
+        x1, y1 = points[k]
+        x2, y2 = points[(k + 1) % n]
+        if y1 == y2:
+            if x1 != x2:
+                edges.append((min(x1, x2), max(x1, x2), y1))
+        elif x1 != x2:
+            raise ValueError(
+                f"Polygon edge {points[k]} -> {points[(k + 1) % n]} is not axis-aligned"
+            )
+    return edges
+
+
+def _merge_runs(runs: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Sort inclusive ``(lo, hi)`` cell runs and join those that overlap or touch."""
+
+    merged: list[tuple[int, int]] = []
+    for lo, hi in sorted(runs):
+        if merged and lo <= merged[-1][1] + 1:
+            if hi > merged[-1][1]:
+                merged[-1] = (merged[-1][0], hi)
+        else:
+            merged.append((lo, hi))
+    return merged
+
+
+def _intersect_runs(a: list[tuple[int, int]], b: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Cells covered by both sorted, disjoint run lists."""
+
+    out: list[tuple[int, int]] = []
+    i = j = 0
+    while i < len(a) and j < len(b):
+        lo = max(a[i][0], b[j][0])
+        hi = min(a[i][1], b[j][1])
+        if lo <= hi:
+            out.append((lo, hi))
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return out
+
+
+@dataclass(frozen=True)
+class _InsideTree:
+    """Segment tree over compressed columns holding the allowed rows as runs.
+
+    Each leaf stores the merged runs of allowed rows in one column and each
+    inner node the rows allowed in every column below it. All runs are kept
+    in two flat arrays sorted by ``node * stride + row``, so a node lookup is
+    one ``searchsorted``. Memory grows with the number of runs rather than
+    with the ``(2n + 1)^2`` compressed grid.
+    """
 
+    size: int
+    stride: int
+    starts: np.ndarray
+    ends: np.ndarray
+
+    def _node_covers(self, node: np.ndarray, y1: np.ndarray, y2: np.ndarray) -> np.ndarray:
+        base = node * self.stride
+        pos = np.searchsorted(self.starts, base + y1, side="right") - 1
+        found = pos >= 0
+        pos = np.maximum(pos, 0)
+        # A run from an earlier node ends below ``base`` and fails the second test.
+        return found & (self.ends[pos] >= base + y2)
+
+    def covers(self, x1: np.ndarray, x2: np.ndarray, y1: np.ndarray, y2: np.ndarray) -> np.ndarray:
+        """Whether every cell in ``[x1, x2] x [y1, y2]`` is allowed, element-wise."""
+
+        ok = np.full(len(x1), self.starts.size > 0)
+        lo = x1 + self.size
+        hi = x2 + self.size + 1
+        while True:
+            active = lo < hi
+            if not active.any():
+                return ok
+            take = active & (lo & 1 == 1)
+            ok[take] &= self._node_covers(lo[take], y1[take], y2[take])
+            lo = lo + take
+            take = active & (hi & 1 == 1)
+            hi = hi - take
+            ok[take] &= self._node_covers(hi[take], y1[take], y2[take])
+            lo >>= 1
+            hi >>= 1
+
+
+def _build_inside_tree(points: list[Point]) -> tuple[list[float], list[float], _InsideTree]:
+    """Rasterise the polygon onto the compressed grid as per-column row runs.
+
+    A scanline sweeps the distinct x coordinates and keeps the sorted y values
+    of the horizontal edges crossing the current open strip. Consecutive pairs
+    of those values bound the inside intervals; each strip's intervals are
+    applied to the gap column inside it and to the coordinate columns on both
+    sides, which also covers the boundary.
+    """
 
-def _rect_sum(prefix: list[list[int]], x1: int, x2: int, y1: int, y2: int) -> int:
-    return prefix[x2 + 1][y2 + 1] - prefix[x1][y2 + 1] - prefix[x2 + 1][y1] + prefix[x1][y1]
+    xs = _make_bounds({p[0] for p in points})
+    ys = _make_bounds({p[1] for p in points})
+    x_index = _index_map((p[0] for p in points), xs)
+    y_index = _index_map((p[1] for p in points), ys)
+
+    starts: dict[int, list[int]] = defaultdict(list)
+    ends: dict[int, list[int]] = defaultdict(list)
+    for xmin, xmax, y in _horizontal_edges(points):
+        starts[xmin].append(y)
+        ends[xmax].append(y)
+
+    ncols = len(xs) - 1
+    columns: list[list[tuple[int, int]]] = [[] for _ in range(ncols)]
+    active: list[int] = []
+    vertex_xs = sorted(x_index)
+    for left, right in pairwise(vertex_xs):
+        for y in ends.get(left, ()):
+            del active[bisect_left(active, y)]
+        for y in starts.get(left, ()):
+            insort(active, y)
+        runs = [(y_index[active[k]], y_index[active[k + 1]]) for k in range(0, len(active) - 1, 2)]
+        # A strip spans at most its two coordinate columns and one gap column.
+        for col in range(x_index[left], x_index[right] + 1):
+            columns[col].extend(runs)
+
+    size = 1 << max(0, (ncols - 1).bit_length())
+    nodes: list[list[tuple[int, int]]] = [[] for _ in range(2 * size)]
+    for col, runs in enumerate(columns):
+        nodes[size + col] = _merge_runs(runs)
+    for node in range(size - 1, 0, -1):
+        nodes[node] = _intersect_runs(nodes[2 * node], nodes[2 * node + 1])
+
+    stride = len(ys) - 1
+    run_starts: list[int] = []
+    run_ends: list[int] = []
+    for node, runs in enumerate(nodes):
+        base = node * stride
+        for lo, hi in runs:
+            run_starts.append(base + lo)
+            run_ends.append(base + hi)
+
+    tree = _InsideTree(
+        size=size,
+        stride=stride,
+        starts=np.array(run_starts, dtype=np.int64),
+        ends=np.array(run_ends, dtype=np.int64),
+    )
+    return xs, ys, tree
 
 
 def parse_input(lines: list[str]) -> list[Point]:
@@ -116,56 +216,166 @@ def _area(a: Point, b: Point) -> int:
     return (abs(a[0] - b[0]) + 1) * (abs(a[1] - b[1]) + 1)
 
 
+def _staircases(points: Iterable[Point]) -> tuple[list[Point], ...]:
+    """Return the lower-left, upper-left, lower-right and upper-right frontiers.
+
+    A point is on the lower-left frontier when no other point lies weakly
+    below-left of it, and likewise for the other directions. All four come
+    from a single sort and are returned with x increasing.
+    """
+
+    ordered = sorted(set(points))
+    lower_left: list[Point] = []
+    upper_left: list[Point] = []
+    for x, y in ordered:
+        # Within one x the points arrive with y increasing.
+        if not lower_left or y < lower_left[-1][1]:
+            lower_left.append((x, y))
+        if not upper_left or y > upper_left[-1][1]:
+            if upper_left and upper_left[-1][0] == x:
+                upper_left.pop()
+            upper_left.append((x, y))
+
+    lower_right: list[Point] = []
+    upper_right: list[Point] = []
+    for x, y in reversed(ordered):
+        # Within one x the points arrive with y decreasing.
+        if not upper_right or y > upper_right[-1][1]:
+            upper_right.append((x, y))
+        if not lower_right or y < lower_right[-1][1]:
+            if lower_right and lower_right[-1][0] == x:
+                lower_right.pop()
+            lower_right.append((x, y))
+    lower_right.reverse()
+    upper_right.reverse()
+
+    return lower_left, upper_left, lower_right, upper_right
+
+
+def _best_across_frontiers(lower: list[Point], upper: list[Point]) -> int:
+    """Largest area with a ``lower`` corner strictly below-left of an ``upper`` one.
+
+    Both frontiers run with x increasing and y decreasing. For a lower corner
+    the valid upper corners form a contiguous window that slides right as the
+    corner moves right, and the area satisfies the quadrangle inequality on
+    that window, so the rightmost best partner is monotone in the row. Divide
+    and conquer over the rows then needs ``O((|lower| + |upper|) log |lower|)``
+    area evaluations.
+    """
+
+    upper_x = [u[0] for u in upper]
+    upper_neg_y = [-u[1] for u in upper]
+    rows: list[tuple[Point, int, int]] = []
+    for corner in lower:
+        first = bisect_right(upper_x, corner[0])  # first u with u.x > x
+        last = bisect_left(upper_neg_y, -corner[1]) - 1  # last u with u.y > y
+        if first <= last:
+            rows.append((corner, first, last))
+
+    best = 0
+    stack = [(0, len(rows) - 1, 0, len(upper) - 1)]
+    while stack:
+        lo, hi, opt_lo, opt_hi = stack.pop()
+        if lo > hi:
+            continue
+        mid = (lo + hi) // 2
+        (x, y), first, last = rows[mid]
+        best_j = -1
+        best_area = 0
+        for j in range(max(opt_lo, first), min(opt_hi, last) + 1):
+            ux, uy = upper[j]
+            area = (ux - x + 1) * (uy - y + 1)
+            if area >= best_area:
+                best_area = area
+                best_j = j
+        best = max(best, best_area)
+        stack.append((lo, mid - 1, opt_lo, best_j))
+        stack.append((mid + 1, hi, best_j, opt_hi))
+    return best
+
+
 def largest_rectangle_two_corners(points: list[Point]) -> int:
     """Largest area using any two red tiles as opposite corners.
 
     The rectangle sides are aligned to the axes. Degenerate rectangles where
     the two corners share an x or y coordinate are ignored.
+
+    An optimal rectangle can always be moved onto corners from the staircase
+    frontiers (a corner dominated by another point in its direction only
+    grows the rectangle when swapped for it), so only opposite frontiers are
+    searched: lower-left with upper-right, then the same on the mirrored
+    points for upper-left with lower-right.
     """
 
-    max_area = 0
-    n = len(points)
-    for i in range(n):
-        x1, y1 = points[i]
-        for j in range(i + 1, n):
-            x2, y2 = points[j]
-            if x1 == x2 or y1 == y2:
-                continue
-            max_area = max(max_area, _area((x1, y1), (x2, y2)))
-    return max_area
+    lower_left, upper_left, lower_right, upper_right = _staircases(points)
+    # Mirroring y turns upper-left / lower-right into lower-left / upper-right.
+    return max(
+        _best_across_frontiers(lower_left, upper_right),
+        _best_across_frontiers([(x, -y) for x, y in upper_left], [(x, -y) for x, y in lower_right]),
+    )
+
+
+# Number of candidate pairs examined per vectorised batch.
+_BATCH_SIZE = 1 << 20
 
 
 def _largest_rectangle_green(points: list[Point]) -> int:
-    """Largest rectangle using red corners and only red/green tiles inside."""
+    """Largest rectangle using red corners and only red/green tiles inside.
+
+    Corners are visited in decreasing order of the largest area they could
+    possibly reach (the distance to the far edges of the bounding box). Pairs
+    are checked in NumPy batches against the allowed-row segment tree, only
+    when their area beats the best so far, and the search stops once no
+    remaining corner can do better.
+    """
 
-    if len(points) < 2:
+    n = len(points)
+    if n < 2:
         return 0
 
-    xs, ys, prefix = _build_allowed_prefix(points)
+    xs, ys, tree = _build_inside_tree(points)
+    x_index = _index_map((p[0] for p in points), xs)
+    y_index = _index_map((p[1] for p in points), ys)
+
+    px = np.array([p[0] for p in points], dtype=np.int64)
+    py = np.array([p[1] for p in points], dtype=np.int64)
+    bound = (np.maximum(px - px.min(), px.max() - px) + 1) * (
+        np.maximum(py - py.min(), py.max() - py) + 1
+    )
+    order = np.argsort(-bound, kind="stable")
+    px, py, bound = px[order], py[order], bound[order]
+    xi = np.array([x_index[x] for x in px.tolist()], dtype=np.int64)
+    yi = np.array([y_index[y] for y in py.tolist()], dtype=np.int64)
+
+    best = 0
+    block = max(1, _BATCH_SIZE // n)
+    for start in range(0, n - 1, block):
+        if bound[start] <= best:
+            break
+        stop = min(start + block, n - 1)
+        # Pair (r, c) is corner start + r with every later corner start + 1 + c.
+        dx = px[start:stop, None] - px[None, start + 1 :]
+        dy = py[start:stop, None] - py[None, start + 1 :]
+        area = (np.abs(dx) + 1) * (np.abs(dy) + 1)
+        later = np.arange(stop - start)[:, None] <= np.arange(n - start - 1)[None, :]
+        r, c = np.nonzero(later & (dx != 0) & (dy != 0) & (area > best))
+        if r.size == 0:
+            continue
 
-    max_area = 0
-    n = len(points)
-    for i in range(n):
-        x1, y1 = points[i]
-        for j in range(i + 1, n):
-            x2, y2 = points[j]
-            if x1 == x2 or y1 == y2:
-                continue
-
-            xmin, xmax = sorted((x1, x2))
-            ymin, ymax = sorted((y1, y2))
-
-            xi1 = _tile_index(xmin, xs)
-            xi2 = _tile_index(xmax, xs)
-            yi1 = _tile_index(ymin, ys)
-            yi2 = _tile_index(ymax, ys)
-
-            area = (xmax - xmin + 1) * (ymax - ymin + 1)
-            allowed = _rect_sum(prefix, xi1, xi2, yi1, yi2)
-            if allowed == area:
-                max_area = max(max_area, area)
-
-    return max_area
+        i = start + r
+        j = start + 1 + c
+        area = area[r, c]
+        inside = tree.covers(
+            np.minimum(xi[i], xi[j]),
+            np.maximum(xi[i], xi[j]),
+            np.minimum(yi[i], yi[j]),
+            np.maximum(yi[i], yi[j]),
+        )
+        fits = area[inside]
+        if fits.size:
+            best = max(best, int(fits.max()))
+
+    return best
 
 
 def part1(points: list[Point]) -> int:
@@ -1,19 +1,38 @@
 from __future__ import annotations
 
+import hashlib
+import math
+import os
 import re
+import time
 from dataclasses import dataclass
-from typing import Iterable
+from fractions import Fraction
+from functools import partial
+from pathlib import Path
+from typing import Callable, Iterable
 
-try:  # z3 is required for part 2
+try:  # z3 is an optional engine for part 2
     import z3  # type: ignore[import-not-found]
-except ImportError:  # pragma: no cover - make requirement explicit
-    raise ImportError("z3-solver is required for Day 10 part 2. Install with `uv add z3-solver`.")
+except ImportError:  # pragma: no cover - the native engine needs no solver
+    z3 = None
 
+from utils.cache import PersistentLRU, cache_path
 from utils.io import read_input_lines
+from utils.parallel import process_map
 
 YEAR = 2025
 DAY = 10
 INF = 10**18
+# The native counter engine keeps up with z3 on machines with at most this
+# many free buttons (see benchmarks/day10_counters.py); ``"auto"`` sends the
+# rest to z3 when it is installed.
+_NATIVE_MAX_FREE = 5
+# Seconds ``run`` gives each machine before retrying it with the other engine.
+_MACHINE_TIMEOUT = 10.0
+# Tolerance of the floating-point LP relaxation in ``_lp_prices``, and the
+# margin by which a bound computed from its prices must clear an integer.
+_LP_EPS = 1e-9
+_FLOOR_EPS = 1e-6
 
 
 @dataclass(frozen=True)
@@ -92,11 +111,89 @@ def parse_input(lines: Iterable[str]) -> list[Machine]:
     return machines
 
 
+def _gf2_solutions(target_mask: int, buttons: list[int]) -> tuple[int, list[int]] | None:
+    """Describe every button combination that produces ``target_mask``.
+
+    Runs Gaussian elimination over GF(2) on the button masks, tracking which
+    buttons make up each reduced vector. Returns a particular solution and a
+    basis of the nullspace (combinations that toggle nothing), both as masks
+    over the buttons, or ``None`` when the target is unreachable. The
+    particular solution only uses pivot buttons, and each nullspace vector
+    uses exactly one non-pivot button.
+    """
+
+    basis: dict[int, tuple[int, int]] = {}  # pivot light -> (lights, buttons)
+    nullspace: list[int] = []
+    for j, vec in enumerate(buttons):
+        combo = 1 << j
+        while vec:
+            pivot = vec.bit_length() - 1
+            if pivot not in basis:
+                basis[pivot] = (vec, combo)
+                break
+            bvec, bcombo = basis[pivot]
+            vec ^= bvec
+            combo ^= bcombo
+        else:
+            nullspace.append(combo)
+
+    vec, combo = target_mask, 0
+    while vec:
+        pivot = vec.bit_length() - 1
+        if pivot not in basis:
+            return None
+        bvec, bcombo = basis[pivot]
+        vec ^= bvec
+        combo ^= bcombo
+    return combo, nullspace
+
+
+def _min_weight_coset(particular: int, nullspace: list[int], pivot_buttons: int) -> int:
+    """Return the fewest set bits in ``particular ^ (any XOR of nullspace)``.
+
+    With ``k`` nullspace vectors and ``r`` pivot buttons, either all ``2^k``
+    combinations are walked in Gray-code order, or, when ``k > r``, a
+    breadth-first search over the ``2^r`` possible pivot parts finds the
+    fewest free buttons giving each one. Either way the work is bounded by
+    ``2^min(k, r)``, which is at most ``2^(n/2)`` for ``n`` buttons.
+    """
+
+    k = len(nullspace)
+    rank = pivot_buttons.bit_count()
+    if k <= rank:
+        best = particular.bit_count()
+        x = particular
+        for step in range(1, 1 << k):
+            x ^= nullspace[(step & -step).bit_length() - 1]
+            best = min(best, x.bit_count())
+        return best
+
+    # Each nullspace vector adds one free button and flips some pivot buttons.
+    flips = [vec & pivot_buttons for vec in nullspace]
+    free_presses = {0: 0}
+    frontier = [0]
+    depth = 0
+    while frontier:
+        depth += 1
+        next_frontier: list[int] = []
+        for state in frontier:
+            for flip in flips:
+                nxt = state ^ flip
+                if nxt not in free_presses:
+                    free_presses[nxt] = depth
+                    next_frontier.append(nxt)
+        frontier = next_frontier
+    return min(
+        presses + (particular ^ state).bit_count() for state, presses in free_presses.items()
+    )
+
+
 def _min_presses(target_mask: int, buttons: list[int]) -> int:
     """Return the minimum number of button presses to reach ``target_mask``.
 
-    Uses a subset-DP over the button list. Each button is either pressed or not
-    pressed because pressing the same button twice cancels out over GF(2).
+    Each button is either pressed or not because pressing it twice cancels out
+    over GF(2). The solutions form a coset of the nullspace of the button
+    matrix, and the lightest member of that coset is the answer.
     """
 
     n = len(buttons)
@@ -105,23 +202,16 @@ def _min_presses(target_mask: int, buttons: list[int]) -> int:
     if n == 0:
         raise ValueError("No buttons available to toggle lights")
 
-    states = [0] * (1 << n)
-    best = float("inf")
-
-    for mask in range(1, 1 << n):
-        lsb = mask & -mask
-        idx = lsb.bit_length() - 1
-        states[mask] = states[mask ^ lsb] ^ buttons[idx]
-
-    for mask, state in enumerate(states):
-        if state == target_mask:
-            presses = mask.bit_count()
-            if presses < best:
-                best = presses
-
-    if best == float("inf"):
+    solved = _gf2_solutions(target_mask, buttons)
+    if solved is None:
         raise ValueError("Target configuration is unreachable with given buttons")
-    return int(best)
+    particular, nullspace = solved
+
+    free_buttons = 0
+    for vec in nullspace:
+        free_buttons |= 1 << (vec.bit_length() - 1)
+    pivot_buttons = ((1 << n) - 1) & ~free_buttons
+    return _min_weight_coset(particular, nullspace, pivot_buttons)
 
 
 def _compress_vectors(vectors: list[list[int]]) -> list[tuple[int, ...]]:
@@ -134,14 +224,10 @@ def _compress_vectors(vectors: list[list[int]]) -> list[tuple[int, ...]]:
     return sorted(unique.keys(), key=lambda v: sum(v), reverse=True)
 
 
-def _min_presses_counters(targets: list[int], buttons: list[list[int]]) -> int:
-    """Return minimal presses to reach exact joltage targets via ILP (z3)."""
-
-    if not targets:
-        return 0
+def _counter_vectors(targets: list[int], buttons: list[list[int]]) -> list[list[int]]:
+    """Turn button index lists into 0/1 counter vectors, dropping no-op buttons."""
 
     m = len(targets)
-
     vectors = []
     for idxs in buttons:
         vec = [0] * m
@@ -154,20 +240,380 @@ def _min_presses_counters(targets: list[int], buttons: list[list[int]]) -> int:
 
     if not vectors:
         raise ValueError("No buttons affect any counters")
+    return vectors
+
+
+def _rref(
+    targets: list[int], vectors: list[list[int]]
+) -> tuple[list[list[Fraction]], list[int]] | None:
+    """Row-reduce ``[A | targets]`` over the rationals, with buttons as columns.
+
+    Returns the non-zero rows and their pivot columns, or ``None`` when the
+    system is inconsistent.
+    """
+
+    n = len(vectors)
+    rows = [[Fraction(vec[i]) for vec in vectors] + [Fraction(t)] for i, t in enumerate(targets)]
+    pivots: list[int] = []
+    r = 0
+    for col in range(n):
+        pivot = next((i for i in range(r, len(rows)) if rows[i][col]), None)
+        if pivot is None:
+            continue
+        rows[r], rows[pivot] = rows[pivot], rows[r]
+        lead = rows[r][col]
+        rows[r] = [value / lead for value in rows[r]]
+        for i, row in enumerate(rows):
+            if i != r and row[col]:
+                factor = row[col]
+                rows[i] = [a - factor * b for a, b in zip(row, rows[r])]
+        pivots.append(col)
+        r += 1
+        if r == len(rows):
+            break
+
+    if any(row[n] for row in rows[r:]):
+        return None
+    return rows[:r], pivots
+
+
+def _lp_prices(
+    targets: list[int], vectors: list[list[int]], caps: list[int]
+) -> tuple[list[float], bool]:
+    """Dual prices of ``A x = targets`` in the LP relaxation of the counter problem.
+
+    Solves ``min sum(x)`` subject to ``A x = targets``, ``0 <= x <= caps``
+    with a dense two-phase simplex in floats (Bland's rule). Returns one
+    price per counter and whether the LP is feasible; for an infeasible LP
+    the prices are those of phase one, which minimises the total violation.
+    The prices only feed ``_lagrange_floor``, whose bound is valid for any
+    prices, so rounding in the floats cannot make the search wrong.
+    """
+
+    m, n = len(targets), len(vectors)
+    cols = 2 * n + m  # presses, slack up to the caps, artificials
+    rows: list[list[float]] = []
+    for i, target in enumerate(targets):
+        row = [0.0] * (cols + 1)
+        for j, vec in enumerate(vectors):
+            row[j] = float(vec[i])
+        row[2 * n + i] = 1.0
+        row[cols] = float(target)
+        rows.append(row)
+    for j, cap in enumerate(caps):
+        row = [0.0] * (cols + 1)
+        row[j] = row[n + j] = 1.0
+        row[cols] = float(cap)
+        rows.append(row)
+    basis = [2 * n + i for i in range(m)] + [n + j for j in range(n)]
+
+    def reduced_costs(cost: list[float]) -> list[float]:
+        rc = cost[:] + [0.0]
+        for r, row in enumerate(rows):
+            c = cost[basis[r]]
+            if c:
+                for col, value in enumerate(row):
+                    rc[col] -= c * value
+        return rc
+
+    def optimise(cost: list[float], entering: int) -> list[float]:
+        while True:
+            rc = reduced_costs(cost)
+            enter = next((c for c in range(entering) if rc[c] < -_LP_EPS), None)
+            if enter is None:
+                return rc
+            leave, ratio = -1, math.inf
+            for r, row in enumerate(rows):
+                if row[enter] > _LP_EPS:
+                    step = row[cols] / row[enter]
+                    if step < ratio - _LP_EPS or (
+                        step <= ratio + _LP_EPS and basis[r] < basis[leave]
+                    ):
+                        leave, ratio = r, step
+            pivot = rows[leave]
+            lead = pivot[enter]
+            for col in range(cols + 1):
+                pivot[col] /= lead
+            for r, row in enumerate(rows):
+                factor = row[enter]
+                if r != leave and factor:
+                    for col in range(cols + 1):
+                        row[col] -= factor * pivot[col]
+            basis[leave] = enter
+
+    # An artificial column holds B^-1 e_i, so its reduced cost is c_i - y_i.
+    # Phase one may bring any column in; phase two keeps the artificials out.
+    rc = optimise([0.0] * (2 * n) + [1.0] * m, cols)
+    if -rc[cols] > _LP_EPS * (1 + sum(targets)):
+        return [1.0 - rc[2 * n + i] for i in range(m)], False
+    rc = optimise([1.0] * n + [0.0] * (n + m), 2 * n)
+    return [-rc[2 * n + i] for i in range(m)], True
+
+
+# Counter prices and the cost per press they were computed for.
+Prices = tuple[list[float], float]
+
+
+def _lagrange_floor(
+    prices: list[float], cost: float, targets: list[int], touches: list[list[int]]
+) -> float:
+    """Lower bound on ``cost * sum(x)`` over ``A x = targets``, ``x >= 0``, for any ``prices``.
+
+    ``touches`` lists the counters of each button. Pricing the constraints
+    at ``y`` turns the objective into ``y . targets`` plus ``cost - y . a``
+    per press, and no button can be pressed more often than the smallest
+    target it touches.
+    """
+
+    value = sum(p * t for p, t in zip(prices, targets))
+    for idxs in touches:
+        reduced = cost - sum(prices[i] for i in idxs)
+        if reduced < 0:
+            value += reduced * min(targets[i] for i in idxs)
+    return value
+
+
+def _usable_buttons(targets: list[int], vectors: list[list[int]]) -> list[list[int]]:
+    """Drop duplicate buttons and buttons touching a counter with target 0.
+
+    Identical buttons are interchangeable, and a button that touches a
+    counter with target 0 can never be pressed.
+    """
+
+    return [
+        list(vec)
+        for vec in _compress_vectors(vectors)
+        if all(t for t, hit in zip(targets, vec) if hit)
+    ]
+
+
+def _min_presses_native(
+    targets: list[int], vectors: list[list[int]], timeout: float | None = None
+) -> int:
+    """Exact minimum of ``sum(x)`` subject to ``A x = targets``, ``x >= 0`` integer.
+
+    Gaussian elimination expresses every pivot button in terms of the free
+    buttons, so only the free buttons are searched. Each button is pressed at
+    most ``min(targets it touches)`` times. Branch-and-bound walks the free
+    buttons depth first and prunes a branch as soon as some pivot button is
+    forced negative or above its bound, or the objective cannot beat the best
+    solution found so far. That last test prices the counters with the dual
+    of the LP relaxation (see ``_lagrange_floor``), solved again at every
+    node that the parent's prices do not already prune. A row whose value
+    can no longer become divisible by its scale is pruned too. The search
+    first looks for solutions no worse than the LP bound and widens that
+    limit until one is found. The floats stay inside the LP; the search
+    itself is on integers.
+
+    Raises ``TimeoutError`` once the search has run for ``timeout`` seconds.
+    """
+
+    vectors = _usable_buttons(targets, vectors)
+    if not vectors:
+        return INF if any(targets) else 0
+
+    n = len(vectors)
+    reduced = _rref(targets, vectors)
+    if reduced is None:
+        return INF
+    rows, pivots = reduced
+    bound = [min(t for t, hit in zip(targets, vec) if hit) for vec in vectors]
+    # Branch on the free buttons with the fewest choices first.
+    pivot_set = set(pivots)
+    free = sorted((j for j in range(n) if j not in pivot_set), key=bound.__getitem__)
+
+    # Scale row r by the lcm of its denominators:
+    #   scale[r] * x[pivot r] = rhs[r] - sum(coef[r][k] * x[free k])
+    scale: list[int] = []
+    rhs: list[int] = []
+    coef: list[list[int]] = []
+    for row in rows:
+        lcm = math.lcm(*(value.denominator for value in row))
+        scale.append(lcm)
+        rhs.append(int(row[n] * lcm))
+        coef.append([int(row[j] * lcm) for j in free])
+    pivot_bound = [bound[p] * s for p, s in zip(pivots, scale)]
+
+    # Objective times ``denom``: const + sum(weight[k] * x[free k]).
+    denom = math.lcm(*scale) if scale else 1
+    const = sum(denom // s * b for s, b in zip(scale, rhs))
+    weight = [denom - sum(denom // s * c[k] for s, c in zip(scale, coef)) for k in range(len(free))]
+
+    # Suffix slack: how far the free buttons from position k onward can still
+    # raise (``up``) or lower (``down``) each scaled pivot value, and how much
+    # they can still reduce the objective.
+    f = len(free)
+    up = [[0] * (f + 1) for _ in rows]
+    down = [[0] * (f + 1) for _ in rows]
+    gain = [0] * (f + 1)
+    for k in range(f - 1, -1, -1):
+        ub = bound[free[k]]
+        for r, c in enumerate(coef):
+            up[r][k] = up[r][k + 1] + (-c[k] * ub if c[k] < 0 else 0)
+            down[r][k] = down[r][k + 1] + (c[k] * ub if c[k] > 0 else 0)
+        gain[k] = gain[k + 1] + (weight[k] * ub if weight[k] < 0 else 0)
+
+    # Row r needs ``scale[r]`` to divide its value once every free button is
+    # pressed; the free buttons from k onward can only change the value by
+    # multiples of ``modulus[r][k]``, so the rest of the value must already
+    # divide by it.
+    modulus = [[math.gcd(s, *c[k:]) for k in range(f + 1)] for s, c in zip(scale, coef)]
+
+    # LP bounds: the buttons still unpressed at depth k are ``unpressed[k]``.
+    touches = [[i for i, hit in enumerate(vec) if hit] for vec in vectors]
+    unpressed = [pivots + free[k:] for k in range(f + 1)]
+    rest_vectors = [[vectors[j] for j in buttons] for buttons in unpressed]
+    rest_touches = [[touches[j] for j in buttons] for buttons in unpressed]
+
+    best = INF * denom
+    values = rhs[:]
+    left = list(targets)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    nodes = 0
+
+    def hopeless(k: int, pressed: int, prices: Prices) -> bool:
+        # With objective prices (cost 1) the floor must beat ``best``; phase
+        # one prices (cost 0) prove infeasibility when their floor is positive.
+        if min(left) < 0:
+            return True
+        value = _lagrange_floor(*prices, left, rest_touches[k])
+        if prices[1]:
+            return (pressed + math.ceil(value - _FLOOR_EPS)) * denom >= best
+        return value > _FLOOR_EPS
+
+    def relax(k: int) -> Prices:
+        caps = [min(left[i] for i in idxs) for idxs in rest_touches[k]]
+        prices, feasible = _lp_prices(left, rest_vectors[k], caps)
+        return prices, 1.0 if feasible else 0.0
+
+    def search(k: int, objective: int, pressed: int, prices: Prices) -> None:
+        nonlocal best, nodes
+        if deadline is not None and nodes & 1023 == 0 and time.monotonic() > deadline:
+            raise TimeoutError(f"Counter search exceeded {timeout}s")
+        nodes += 1
+        if any(value % mod[k] for value, mod in zip(values, modulus)):
+            return
+        # The parent's prices screen this node cheaply; only a node that
+        # survives solves its own LP, whose prices then screen its children.
+        if k < f and hopeless(k, pressed, prices):
+            return
+        if k < f - 1:
+            prices = relax(k)
+            if hopeless(k, pressed, prices):
+                return
+        if k == f:
+            if all(
+                0 <= value <= cap and value % s == 0
+                for value, cap, s in zip(values, pivot_bound, scale)
+            ):
+                best = objective
+            return
+
+        # Narrow x[free k] to the values that keep every pivot button within
+        # [0, bound] for some choice of the free buttons after it.
+        lo, hi = 0, bound[free[k]]
+        column = [c[k] for c in coef]
+        for r, c in enumerate(column):
+            low = values[r] - pivot_bound[r] - down[r][k + 1]
+            high = values[r] + up[r][k + 1]
+            if c > 0:
+                lo, hi = max(lo, -(-low // c)), min(hi, high // c)
+            elif c < 0:
+                lo, hi = max(lo, -(-high // c)), min(hi, low // c)
+            elif low > 0 or high < 0:
+                return
+            if lo > hi:
+                return
+
+        # On the last free button every pivot value must also divide by its
+        # row's scale; those congruences repeat every ``period`` presses, so
+        # only the press counts that meet them are tried.
+        period = 1
+        if k == f - 1 and denom > 1:
+            for r, c in enumerate(column):
+                period = math.lcm(period, scale[r] // math.gcd(c, scale[r]))
+            first = next(
+                (
+                    x
+                    for x in range(lo, min(hi, lo + period - 1) + 1)
+                    if all((v - c * x) % sc == 0 for v, c, sc in zip(values, column, scale))
+                ),
+                None,
+            )
+            if first is None:
+                return
+            lo, hi = first, first + (hi - first) // period * period
+
+        # Walk in the direction that grows the objective, so the first press
+        # count that cannot beat ``best`` ends the loop.
+        w = weight[k]
+        rest = gain[k + 1]
+        hits = touches[free[k]]
+        presses = range(hi, lo - 1, -period) if w < 0 else range(lo, hi + 1, period)
+        for x in presses:
+            total = objective + w * x
+            if total + rest >= best:
+                break
+            for r, c in enumerate(column):
+                values[r] -= c * x
+            for i in hits:
+                left[i] -= x
+            search(k + 1, total, pressed + x, prices)
+            for r, c in enumerate(column):
+                values[r] += c * x
+            for i in hits:
+                left[i] += x
+
+    # Without an incumbent nothing is pruned, so look for a solution of at
+    # most ``limit`` presses first, starting from the LP bound and widening
+    # the limit geometrically until it covers every button at its cap.
+    root = relax(0)
+    if not root[1]:
+        # Phase one may still leave a sliver of violation to rounding, so
+        # only a positive certificate settles infeasibility; else search.
+        if _lagrange_floor(*root, left, rest_touches[0]) > _FLOOR_EPS:
+            return INF
+        limit = 0
+    else:
+        limit = math.ceil(_lagrange_floor(*root, left, rest_touches[0]) - _FLOOR_EPS)
+    step, most = 1, sum(bound)
+    while True:
+        cutoff = (limit + 1) * denom if limit < most else INF * denom
+        best = cutoff
+        search(0, const, 0, root)
+        if best < cutoff:
+            return best // denom
+        if limit >= most:
+            return INF
+        limit, step = limit + step, step * 2
+
+
+def _min_presses_z3(
+    targets: list[int], vectors: list[list[int]], timeout: float | None = None
+) -> int:
+    """Solve the same integer program with z3's optimiser."""
+
+    if z3 is None:
+        raise ImportError("z3-solver is required for engine='z3'. Install with `uv add z3-solver`.")
 
     solver = z3.Optimize()
+    if timeout is not None:
+        solver.set(timeout=max(1, int(timeout * 1000)))
     vars_ = [z3.Int(f"x{j}") for j in range(len(vectors))]
     for v in vars_:
         solver.add(v >= 0)
 
-    for i in range(m):
+    for i, target in enumerate(targets):
         contrib = [vars_[j] for j, vec in enumerate(vectors) if vec[i]]
-        if not contrib and targets[i] != 0:
+        if not contrib and target != 0:
             return INF
-        solver.add(z3.Sum(contrib) == targets[i])
+        solver.add(z3.Sum(contrib) == target)
 
     solver.minimize(z3.Sum(vars_))
-    if solver.check() != z3.sat:
+    status = solver.check()
+    if status == z3.unknown:
+        raise TimeoutError(f"z3 gave up: {solver.reason_unknown()}")
+    if status != z3.sat:
         return INF
     model = solver.model()
     total = 0
@@ -177,23 +623,261 @@ def _min_presses_counters(targets: list[int], buttons: list[list[int]]) -> int:
     return total
 
 
-def part1(machines: list[Machine]) -> int:
-    """Sum the fewest button presses required for every machine."""
+def _min_presses_auto(
+    targets: list[int], vectors: list[list[int]], timeout: float | None = None
+) -> int:
+    """Use the native engine unless the machine has many free buttons and z3 is installed."""
+
+    if z3 is not None:
+        usable = _usable_buttons(targets, vectors)
+        reduced = _rref(targets, usable) if usable else None
+        if reduced is not None and len(usable) - len(reduced[1]) > _NATIVE_MAX_FREE:
+            return _COUNTER_ENGINES["z3"](targets, vectors, timeout)
+    return _COUNTER_ENGINES["native"](targets, vectors, timeout)
+
+
+_COUNTER_ENGINES = {
+    "auto": _min_presses_auto,
+    "native": _min_presses_native,
+    "z3": _min_presses_z3,
+}
+
+
+def _min_presses_counters(
+    targets: list[int],
+    buttons: list[list[int]],
+    engine: str = "auto",
+    timeout: float | None = None,
+) -> int:
+    """Return minimal presses to reach exact joltage targets.
+
+    ``engine`` selects the in-house branch-and-bound solver (``"native"``),
+    z3 (``"z3"``), or by default whichever suits the machine (``"auto"``);
+    all are exact. Each raises ``TimeoutError`` when it cannot finish within
+    ``timeout`` seconds.
+    """
+
+    try:
+        solve = _COUNTER_ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown engine: {engine!r}") from None
+    if not targets:
+        return 0
+    return solve(targets, _counter_vectors(targets, buttons), timeout)
+
+
+Form = tuple[tuple[int, ...], tuple[tuple[int, ...], ...]]
+
+
+def _canonical_form(targets: list[int], buttons: Iterable[Iterable[int]]) -> Form:
+    """Relabel a machine so that reorderings of its buttons or counters coincide.
+
+    Returns ``(targets, buttons)`` for an equivalent machine: duplicate and
+    empty buttons are dropped, counters are ordered by a colour refinement of
+    their targets and the buttons touching them, and buttons are then sorted.
+    The form is always equivalent to the input; machines that differ only by
+    order map to the same form unless refinement leaves ties that hide the
+    difference.
+    """
+
+    m = len(targets)
+    vectors = []
+    for idxs in buttons:
+        vec = [0] * m
+        for idx in idxs:
+            if idx >= m:
+                raise ValueError("Button index exceeds number of counters")
+            vec[idx] = 1
+        vectors.append(vec)
+    groups = [
+        tuple(i for i, hit in enumerate(vec) if hit)
+        for vec in _compress_vectors(vectors)
+        if any(vec)
+    ]
+
+    colours = list(targets)
+    for _ in range(2):
+        button_colours = [tuple(sorted(colours[i] for i in group)) for group in groups]
+        touching: list[list[tuple[int, ...]]] = [[] for _ in range(m)]
+        for group, colour in zip(groups, button_colours):
+            for i in group:
+                touching[i].append(colour)
+        signatures = [(colours[i], tuple(sorted(touching[i]))) for i in range(m)]
+        ranks = {sig: rank for rank, sig in enumerate(sorted(set(signatures)))}
+        colours = [ranks[sig] for sig in signatures]
+
+    order = sorted(range(m), key=lambda i: (colours[i], i))
+    relabel = {old: new for new, old in enumerate(order)}
+    return (
+        tuple(targets[i] for i in order),
+        tuple(sorted(tuple(sorted(relabel[i] for i in group)) for group in groups)),
+    )
+
+
+def _lights_form(machine: Machine) -> Form:
+    width = max([machine.lights_mask.bit_length()] + [b.bit_length() for b in machine.button_masks])
+    lights = [machine.lights_mask >> i & 1 for i in range(width)]
+    buttons = [[i for i in range(width) if mask >> i & 1] for mask in machine.button_masks]
+    return _canonical_form(lights, buttons)
+
+
+def _counters_form(machine: Machine) -> Form:
+    # A machine listed without joltage targets needs no presses, whatever
+    # counters its buttons name.
+    if not machine.joltage_targets:
+        return ((), ())
+    return _canonical_form(machine.joltage_targets, machine.button_indices)
+
 
-    return sum(_min_presses(machine.lights_mask, machine.button_masks) for machine in machines)
+# Cached answers are keyed by this file's source too, so editing a solver
+# invalidates every answer it produced.
+_SOURCE_HASH = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()
 
 
-def part2(machines: list[Machine]) -> int:
-    """Fewest presses to satisfy all joltage requirements."""
+def _form_key(kind: str, form: Form) -> str:
+    return hashlib.sha1(repr((kind, _SOURCE_HASH, form)).encode()).hexdigest()
+
+
+def _solve_lights(form: Form) -> int:
+    lights, buttons = form
+    target = sum(bit << i for i, bit in enumerate(lights))
+    return _min_presses(target, [sum(1 << i for i in group) for group in buttons])
+
+
+def _solve_counters(form: Form, engine: str, timeout: float | None) -> int:
+    targets, buttons = form
+    return _min_presses_counters(list(targets), [list(b) for b in buttons], engine, timeout)
+
+
+def _form_size(form: Form) -> tuple[int, int]:
+    """Scheduling key: machines with more buttons and larger targets go first."""
+
+    targets, buttons = form
+    return len(buttons), max(targets, default=0)
+
+
+# With ``workers=None``, fewer pending forms than this are solved in-process:
+# starting a pool costs more than it saves on a handful of machines.
+_MIN_PARALLEL_FORMS = 32
+
+# Timed-out machines are retried once with the other counter engine.
+_FALLBACK_ENGINE = {"auto": "z3", "native": "z3", "z3": "native"}
+
+
+def _try_solve(solve: Callable[[Form], int], form: Form) -> int | None:
+    """Run ``solve``; a ``TimeoutError`` becomes ``None`` so the other machines carry on."""
+
+    try:
+        return solve(form)
+    except TimeoutError:
+        return None
+
+
+def _solve_pending(
+    solve: Callable[[Form], int], forms: list[Form], workers: int | None
+) -> list[int | None]:
+    if workers is None:
+        workers = 1 if len(forms) < _MIN_PARALLEL_FORMS else os.cpu_count() or 1
+    # A few chunks per worker keeps the pool balanced without a round trip per machine.
+    chunksize = max(1, len(forms) // (4 * workers))
+    return process_map(
+        partial(_try_solve, solve), forms, workers, chunksize=chunksize, priority=_form_size
+    )
+
+
+def _solve_forms(
+    kind: str,
+    forms: list[Form],
+    solve: Callable[[Form], int],
+    workers: int | None,
+    cache: PersistentLRU | None,
+    retry: Callable[[Form], int] | None = None,
+) -> list[int]:
+    """Solve each distinct form once, consulting and filling ``cache`` in this process.
+
+    Forms whose ``solve`` times out are passed to ``retry`` (if given). Every
+    form that was solved is cached before a ``TimeoutError`` naming the
+    machines that are still unsolved is raised.
+    """
+
+    keys = [_form_key(kind, form) for form in forms]
+    answers: dict[str, int] = {}
+    pending: dict[str, Form] = {}
+    for key, form in zip(keys, forms):
+        if key in answers or key in pending:
+            continue
+        if cache is not None and key in cache:
+            answers[key] = cache[key]
+        else:
+            pending[key] = form
+
+    solved = dict(zip(pending, _solve_pending(solve, list(pending.values()), workers)))
+    unsolved = [key for key, value in solved.items() if value is None]
+    if unsolved and retry is not None:
+        retried = _solve_pending(retry, [pending[key] for key in unsolved], workers)
+        solved.update(zip(unsolved, retried))
+
+    for key, value in solved.items():
+        if value is not None:
+            answers[key] = value
+            if cache is not None:
+                cache[key] = value
+    missing = [i for i, key in enumerate(keys) if key not in answers]
+    if missing:
+        raise TimeoutError(f"Machines {missing} ran out of time")
+    return [answers[key] for key in keys]
+
+
+def part1(
+    machines: list[Machine], workers: int | None = 1, cache: PersistentLRU | None = None
+) -> int:
+    """Sum the fewest button presses required for every machine.
+
+    Machines are reduced to a canonical form first, so equivalent machines are
+    solved once. ``workers`` > 1 solves them in a process pool (``None`` uses
+    every CPU, but stays in-process for small inputs), and ``cache``
+    remembers answers across calls.
+    """
+
+    forms = [_lights_form(machine) for machine in machines]
+    return sum(_solve_forms("lights", forms, _solve_lights, workers, cache))
+
+
+def part2(
+    machines: list[Machine],
+    engine: str = "auto",
+    workers: int | None = 1,
+    timeout: float | None = None,
+    cache: PersistentLRU | None = None,
+) -> int:
+    """Fewest presses to satisfy all joltage requirements.
+
+    ``engine`` is as in ``_min_presses_counters``; ``workers`` and ``cache``
+    behave as in ``part1``. ``timeout`` caps the seconds spent on any single
+    machine. A machine that exceeds it is retried with the fallback engine
+    (z3 for ``"auto"`` and ``"native"``, when installed) while the rest carry
+    on; if it still times out, ``TimeoutError`` lists the machines left
+    unsolved.
+    """
 
-    return sum(_min_presses_counters(m.joltage_targets, m.button_indices) for m in machines)
+    if engine not in _COUNTER_ENGINES:
+        raise ValueError(f"Unknown engine: {engine!r}")
+    forms = [_counters_form(machine) for machine in machines]
+    solve = partial(_solve_counters, engine=engine, timeout=timeout)
+    fallback = _FALLBACK_ENGINE[engine]
+    retry = None
+    if fallback != "z3" or z3 is not None:
+        retry = partial(_solve_counters, engine=fallback, timeout=timeout)
+    return sum(_solve_forms(f"counters-{engine}", forms, solve, workers, cache, retry))
 
 
 def run(variant: str | None = None) -> None:
     lines = read_input_lines(YEAR, DAY, variant)
     machines = parse_input(lines)
-    print(f"Part 1: {part1(machines)}")
-    print(f"Part 2: {part2(machines)}")
+    cache = PersistentLRU(path=cache_path(f"{YEAR}-{DAY:02d}"))
+    print(f"Part 1: {part1(machines, workers=None, cache=cache)}")
+    print(f"Part 2: {part2(machines, workers=None, timeout=_MACHINE_TIMEOUT, cache=cache)}")
+    cache.save()
 
 
 if __name__ == "__main__":
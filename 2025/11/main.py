@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+from array import array
 from collections import defaultdict
-from typing import Dict, Iterable, List
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List
 
-try:
+try:  # z3 is an optional engine
     import z3  # type: ignore[import-not-found]
-except ImportError as exc:  # pragma: no cover - dependency should be installed
-    raise ImportError("z3-solver is required for Day 11. Install with `uv add z3-solver`.") from exc
+except ImportError:  # pragma: no cover - the default engine needs no solver
+    z3 = None
 
 from utils.io import read_input_lines
 
@@ -45,74 +47,223 @@ def parse_input(lines: Iterable[str]) -> Graph:
     return graph
 
 
-def _collect_reachable(graph: Graph, start: str) -> set[str]:
-    reachable = {start}
+@dataclass(frozen=True)
+class CompactGraph:
+    """Device graph with names interned to dense ints and CSR adjacency.
+
+    Node ``i`` is called ``names[i]`` and its successors are
+    ``targets[offsets[i]:offsets[i + 1]]``. Devices that only appear as
+    targets (such as ``out``) get ids too, with no successors.
+    """
+
+    names: list[str]
+    index: dict[str, int]
+    offsets: array
+    targets: array
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def successors(self, node: int) -> array:
+        return self.targets[self.offsets[node] : self.offsets[node + 1]]
+
+
+def compile_graph(graph: Graph) -> CompactGraph:
+    """Intern device names and pack the adjacency lists into CSR arrays."""
+
+    index: dict[str, int] = {}
+    for src, outs in graph.items():
+        index.setdefault(src, len(index))
+        for dst in outs:
+            index.setdefault(dst, len(index))
+
+    offsets = array("i", [0]) * (len(index) + 1)
+    for src, outs in graph.items():
+        offsets[index[src] + 1] = len(outs)
+    for i in range(len(index)):
+        offsets[i + 1] += offsets[i]
+
+    targets = array("i", [0]) * offsets[-1]
+    for src, outs in graph.items():
+        pos = offsets[index[src]]
+        for k, dst in enumerate(outs):
+            targets[pos + k] = index[dst]
+
+    return CompactGraph(list(index), index, offsets, targets)
+
+
+def _scan_from(graph: CompactGraph, start: int) -> tuple[bytearray, array]:
+    """Mark the nodes reachable from ``start`` and count their incoming edges.
+
+    In-degrees only include edges between reachable nodes, ready for
+    ``_topo_order``.
+    """
+
+    offsets, targets = graph.offsets, graph.targets
+    reachable = bytearray(len(graph))
+    indegree = array("i", [0]) * len(graph)
+    reachable[start] = 1
     stack = [start]
     while stack:
         node = stack.pop()
-        for nxt in graph.get(node, []):
-            if nxt not in reachable:
-                reachable.add(nxt)
+        for nxt in targets[offsets[node] : offsets[node + 1]]:
+            indegree[nxt] += 1
+            if not reachable[nxt]:
+                reachable[nxt] = 1
                 stack.append(nxt)
-    return reachable
+    return reachable, indegree
 
 
-def _check_for_cycles(graph: Graph, start: str, reachable: set[str]) -> None:
-    visited: set[str] = set()
-    stack: set[str] = set()
+def _topo_order(graph: CompactGraph, indegree: array, roots: Iterable[int], expected: int) -> array:
+    """Order ``expected`` nodes with Kahn's algorithm, starting from ``roots``.
 
-    def dfs(node: str) -> None:
-        stack.add(node)
-        for nxt in graph.get(node, []):
-            if nxt not in reachable:
-                continue
-            if nxt in stack:
-                raise ValueError("Cycle detected in graph reachable from start")
-            if nxt not in visited:
-                dfs(nxt)
-        stack.remove(node)
-        visited.add(node)
+    Consumes ``indegree``; roots with incoming edges are skipped. Raises
+    ``ValueError`` on a cycle, which shows up as nodes that never reach
+    in-degree zero.
+    """
 
-    dfs(start)
+    offsets, targets = graph.offsets, graph.targets
+    order = array("i", [node for node in roots if indegree[node] == 0])
+    head = 0
+    while head < len(order):
+        node = order[head]
+        head += 1
+        for nxt in targets[offsets[node] : offsets[node + 1]]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                order.append(nxt)
+    if len(order) != expected:
+        raise ValueError("Cycle detected in graph")
+    return order
 
 
-def _count_paths_dfs(graph: Graph, start: str, end: str, reachable: set[str]) -> int:
-    memo: dict[str, int] = {}
-    active: set[str] = set()
+def _paths_to(graph: CompactGraph, order: array, end: int) -> list[int]:
+    """Return ``ways`` with ``ways[v]`` = number of paths from ``v`` to ``end``.
 
-    def dfs(node: str) -> int:
-        if node == end:
-            return 1
-        if node in memo:
-            return memo[node]
+    Only nodes in ``order`` (a topological order containing ``end``) are filled.
+    """
 
-        active.add(node)
-        total = 0
-        for nxt in graph.get(node, []):
-            if nxt not in reachable:
-                continue
-            if nxt in active:
-                raise ValueError("Cycle detected while counting paths")
-            total += dfs(nxt)
-        active.remove(node)
-        memo[node] = total
-        return total
+    offsets, targets = graph.offsets, graph.targets
+    ways = [0] * len(graph)
+    ways[end] = 1
+    lookup = ways.__getitem__
+    for node in reversed(order):
+        if node != end:
+            ways[node] = sum(map(lookup, targets[offsets[node] : offsets[node + 1]]))
+    return ways
+
+
+def _count_segment(graph: CompactGraph, order: array, rank: array, src: int, dst: int) -> int:
+    """Count paths ``src -> dst`` by a forward DP over ``order[rank[src]:rank[dst]]``.
+
+    Every node on such a path ranks between the two ends, so only that slice
+    of the topological order is visited.
+    """
 
-    return dfs(start)
+    lo, hi = rank[src], rank[dst]
+    if lo > hi:
+        return 0
+    offsets, targets = graph.offsets, graph.targets
+    ways = {src: 1}
+    for node in order[lo:hi]:
+        count = ways.pop(node, 0)
+        if not count:
+            continue
+        for nxt in targets[offsets[node] : offsets[node + 1]]:
+            if rank[nxt] <= hi:
+                ways[nxt] = ways.get(nxt, 0) + count
+    return ways.get(dst, 0)
+
+
+def _count_through(
+    start: int,
+    end: int,
+    required: Iterable[int],
+    rank: array,
+    segment: Callable[[int, int], int],
+) -> int:
+    """Count paths ``start -> end`` that visit every ``required`` node.
 
+    In a DAG a path meets nodes in increasing topological ``rank``, so the
+    required nodes can only be visited in one order and the count factors
+    into ``segment`` counts ``start -> r1 -> ... -> rk -> end``.
+    """
+
+    total = 1
+    src = start
+    for node in sorted(set(required), key=rank.__getitem__) + [end]:
+        total *= segment(src, node)
+        if not total:
+            return 0
+        src = node
+    return total
 
-def _count_paths_z3(graph: Graph, start: str, end: str, reachable: set[str]) -> int:
+
+class PathCounter:
+    """Answer many path-count queries against one acyclic device graph.
+
+    The topological order is computed once (``ValueError`` if the graph has
+    any cycle). The first query ending at a node computes the path counts
+    from every node to it in O(|V| + |E|); later queries reuse them, so a
+    query with ``k`` required nodes costs ``k + 1`` lookups.
+    """
+
+    def __init__(self, graph: Graph | CompactGraph):
+        self.graph = graph if isinstance(graph, CompactGraph) else compile_graph(graph)
+        n = len(self.graph)
+        indegree = array("i", [0]) * n
+        for node in self.graph.targets:
+            indegree[node] += 1
+        self.order = _topo_order(self.graph, indegree, range(n), n)
+        self.rank = array("i", [0]) * n
+        for pos, node in enumerate(self.order):
+            self.rank[node] = pos
+        self._paths_to: dict[int, list[int]] = {}
+
+    def paths_to(self, end: int) -> list[int]:
+        """Path counts from every node to node id ``end`` (cached)."""
+
+        ways = self._paths_to.get(end)
+        if ways is None:
+            ways = self._paths_to[end] = _paths_to(self.graph, self.order, end)
+        return ways
+
+    def count(self, start: str, end: str, required: Iterable[str] = ()) -> int:
+        """Count paths from ``start`` to ``end`` that visit every ``required`` device."""
+
+        index = self.graph.index
+        required = tuple(required)
+        if start not in index:
+            return _count_from_unknown(start, end, required)
+        if any(name not in index for name in (end, *required)):
+            return 0
+        return _count_through(
+            index[start],
+            index[end],
+            (index[name] for name in required),
+            self.rank,
+            lambda src, dst: self.paths_to(dst)[src],
+        )
+
+
+def _require_z3() -> None:
+    if z3 is None:
+        raise ImportError("z3-solver is required for engine='z3'. Install with `uv add z3-solver`.")
+
+
+def _count_paths_z3(graph: CompactGraph, start: int, end: int, order: array) -> int:
+    _require_z3()
     solver = z3.Solver()
 
-    vars_: dict[str, z3.ArithRef] = {node: z3.Int(f"paths_{node}") for node in reachable}
+    vars_: dict[int, z3.ArithRef] = {node: z3.Int(f"paths_{node}") for node in order}
     for var in vars_.values():
         solver.add(var >= 0)
 
     solver.add(vars_[end] == 1)
-    for node in reachable:
+    for node in order:
         if node == end:
             continue
-        outs = [vars_[nxt] for nxt in graph.get(node, []) if nxt in reachable]
+        outs = [vars_[nxt] for nxt in graph.successors(node)]
         if outs:
             solver.add(vars_[node] == z3.Sum(outs))
         else:
@@ -127,96 +278,139 @@ def _count_paths_z3(graph: Graph, start: str, end: str, reachable: set[str]) ->
     )
 
 
-def _topo_order(graph: Graph, start: str, reachable: set[str]) -> list[str]:
-    order: list[str] = []
-    seen: set[str] = set()
+def _required_bits(graph: CompactGraph, required: tuple[int, ...]) -> list[int]:
+    bits = [0] * len(graph)
+    for i, node in enumerate(required):
+        bits[node] |= 1 << i
+    return bits
 
-    def dfs(node: str) -> None:
-        seen.add(node)
-        for nxt in graph.get(node, []):
-            if nxt in reachable and nxt not in seen:
-                dfs(nxt)
-        order.append(node)
 
-    dfs(start)
-    order.reverse()
-    return order
+def _count_paths_with_required_dag(
+    graph: CompactGraph, start: int, end: int, order: array, required: tuple[int, ...]
+) -> int:
+    """Push path counts along a topological order, one count per visited-set mask.
 
+    The counts for node ``v`` and mask ``m`` live at ``dp[v * 2**k + m]`` in a
+    single flat list (Python ints, since path counts outgrow machine words).
+    """
 
-def _count_paths_with_required_dag(
-    graph: Graph, start: str, end: str, reachable: set[str], required: tuple[str, ...]
+    offsets, targets = graph.offsets, graph.targets
+    width = 1 << len(required)
+    all_mask = width - 1
+    bits = _required_bits(graph, required)
+
+    dp = [0] * (len(graph) * width)
+    dp[start * width + bits[start]] = 1
+
+    for node in order:
+        base = node * width
+        row = dp[base : base + width]
+        if not any(row):
+            continue
+        for nxt in targets[offsets[node] : offsets[node + 1]]:
+            nxt_base = nxt * width
+            nxt_bit = bits[nxt]
+            for mask, count in enumerate(row):
+                if count:
+                    dp[nxt_base + (mask | nxt_bit)] += count
+
+    return dp[end * width + all_mask]
+
+
+def _count_paths_with_required_dfs(
+    graph: CompactGraph, start: int, end: int, order: array, required: tuple[int, ...]
 ) -> int:
-    if not required:
-        return _count_paths_dfs(graph, start, end, reachable)
+    """Memoised DFS over ``(node, visited-set mask)`` states with an explicit stack.
 
-    if end not in reachable or any(r not in reachable for r in required):
-        return 0
+    A state is finished once all of its successors are; until then it stays
+    on the stack beneath them. The graph is known to be acyclic, so the
+    stack always drains.
+    """
 
-    order = _topo_order(graph, start, reachable)
-    k = len(required)
-    all_mask = (1 << k) - 1
-    req_bits = {name: 1 << i for i, name in enumerate(required)}
+    offsets, targets = graph.offsets, graph.targets
+    width = 1 << len(required)
+    all_mask = width - 1
+    bits = _required_bits(graph, required)
+    memo: list[int | None] = [None] * (len(graph) * width)
 
-    def bit_for(node: str) -> int:
-        return req_bits.get(node, 0)
+    stack = [start * width + bits[start]]
+    while stack:
+        key = stack[-1]
+        if memo[key] is not None:
+            stack.pop()
+            continue
+        node, mask = divmod(key, width)
+        if node == end:
+            memo[key] = 1 if mask == all_mask else 0
+            stack.pop()
+            continue
 
-    dp: dict[str, list[int]] = defaultdict(lambda: [0] * (1 << k))
-    start_mask = bit_for(start)
-    dp[start][start_mask] = 1
+        total = 0
+        waiting = False
+        for nxt in targets[offsets[node] : offsets[node + 1]]:
+            nxt_key = nxt * width + (mask | bits[nxt])
+            known = memo[nxt_key]
+            if known is None:
+                stack.append(nxt_key)
+                waiting = True
+            elif not waiting:
+                total += known
+        if not waiting:
+            memo[key] = total
+            stack.pop()
+
+    return memo[start * width + bits[start]]  # type: ignore[return-value]
+
+
+def _count_paths_with_required_segments(
+    graph: CompactGraph, start: int, end: int, order: array, required: tuple[int, ...]
+) -> int:
+    """Multiply segment counts between the required nodes in topological order.
 
-    for node in order:
-        node_state = dp[node]
-        for nxt in graph.get(node, []):
-            if nxt not in reachable:
-                continue
-            nxt_bit = bit_for(nxt)
-            nxt_state = dp[nxt]
-            for mask, count in enumerate(node_state):
-                if count == 0:
-                    continue
-                nxt_state[mask | nxt_bit] += count
+    The segments cover disjoint slices of ``order``, so the whole count costs
+    about one pass over the reachable graph however many nodes are required.
+    """
 
-    end_state = dp[end]
-    return sum(count for mask, count in enumerate(end_state) if mask & all_mask == all_mask)
+    rank = array("i", [0]) * len(graph)
+    for pos, node in enumerate(order):
+        rank[node] = pos
+    return _count_through(
+        start, end, required, rank, lambda src, dst: _count_segment(graph, order, rank, src, dst)
+    )
 
 
 def _count_paths_with_required_z3(
-    graph: Graph, start: str, end: str, reachable: set[str], required: tuple[str, ...]
+    graph: CompactGraph, start: int, end: int, order: array, required: tuple[int, ...]
 ) -> int:
     if not required:
-        return _count_paths_z3(graph, start, end, reachable)
-    if end not in reachable or any(r not in reachable for r in required):
-        return 0
+        return _count_paths_z3(graph, start, end, order)
 
     k = len(required)
     all_mask = (1 << k) - 1
-    req_bits = {name: 1 << i for i, name in enumerate(required)}
-    preds: dict[str, list[str]] = defaultdict(list)
-    for src, outs in graph.items():
-        for dst in outs:
-            if dst in reachable and src in reachable:
-                preds[dst].append(src)
-
-    def bit_for(node: str) -> int:
-        return req_bits.get(node, 0)
+    bits = _required_bits(graph, required)
+    preds: dict[int, list[int]] = defaultdict(list)
+    for src in order:
+        for dst in graph.successors(src):
+            preds[dst].append(src)
 
+    _require_z3()
     solver = z3.Solver()
-    vars_: dict[tuple[str, int], z3.ArithRef] = {}
-    for node in reachable:
+    vars_: dict[tuple[int, int], z3.ArithRef] = {}
+    for node in order:
         for mask in range(1 << k):
             v = z3.Int(f"paths_{node}_{mask}")
             vars_[(node, mask)] = v
             solver.add(v >= 0)
 
-    start_bit = bit_for(start)
+    start_bit = bits[start]
     for mask in range(1 << k):
         val = 1 if mask == start_bit else 0
         solver.add(vars_[(start, mask)] == val)
 
-    for node in reachable:
+    for node in order:
         if node == start:
             continue
-        node_bit = bit_for(node)
+        node_bit = bits[node]
         node_preds = preds.get(node, [])
         for mask in range(1 << k):
             contribs = []
@@ -231,46 +425,95 @@ def _count_paths_with_required_z3(
         raise ValueError("Path counting constraints are unsatisfiable (likely due to cycles)")
 
     model = solver.model()
-    total = 0
-    for mask in range(1 << k):
-        if mask & all_mask == all_mask:
-            val = model.eval(vars_[(end, mask)], model_completion=True).as_long()  # type: ignore[attr-defined]
-            total += int(val)
-    return total
+    val = model.eval(vars_[(end, all_mask)], model_completion=True).as_long()  # type: ignore[attr-defined]
+    return int(val)
 
 
-def part1(graph: Graph, start: str = START_PART1, end: str = END) -> int:
-    """Count distinct paths from ``start`` to ``end`` in a DAG using DFS+memo."""
+ENGINES = {
+    "segments": _count_paths_with_required_segments,
+    "dag": _count_paths_with_required_dag,
+    "dfs": _count_paths_with_required_dfs,
+    "z3": _count_paths_with_required_z3,
+}
 
-    reachable = _collect_reachable(graph, start)
-    if end not in reachable:
+
+def _count_from_unknown(start: str, end: str, required: tuple[str, ...]) -> int:
+    # A device with no connections reaches only itself: the empty path
+    # counts when it is also the end and the only required device.
+    return int(end == start and all(name == start for name in required))
+
+
+def _count_paths(
+    graph: Graph | CompactGraph, start: str, end: str, required: tuple[str, ...], engine: str
+) -> int:
+    try:
+        count = ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown engine {engine!r}; choose from {sorted(ENGINES)}") from None
+
+    compact = graph if isinstance(graph, CompactGraph) else compile_graph(graph)
+    index = compact.index
+    if start not in index:
+        return _count_from_unknown(start, end, required)
+    if end not in index:
+        return 0  # a device with no connections cannot lie on a path
+
+    start_id, end_id = index[start], index[end]
+    reachable, indegree = _scan_from(compact, start_id)
+    if not reachable[end_id]:
+        return 0
+    # Cycles are reported before required devices are looked up, as they
+    # always were, so an unknown required device cannot hide one.
+    order = _topo_order(compact, indegree, [start_id], reachable.count(1))
+    if any(name not in index or not reachable[index[name]] for name in required):
         return 0
-    _check_for_cycles(graph, start, reachable)
-    return _count_paths_dfs(graph, start, end, reachable)
+    required_ids = tuple(index[name] for name in required)
+    return count(compact, start_id, end_id, order, required_ids)
+
+
+def part1(
+    graph: Graph | CompactGraph,
+    start: str = START_PART1,
+    end: str = END,
+    engine: str = "segments",
+) -> int:
+    """Count distinct paths from ``start`` to ``end`` in a DAG.
+
+    ``engine`` picks the counting backend: ``"segments"`` (products of
+    segment counts along the topological order, the default), ``"dag"``
+    (topological DP over visited-set masks), ``"dfs"`` (memoised DFS) or
+    ``"z3"`` (linear constraints).
+    """
+
+    return _count_paths(graph, start, end, (), engine)
 
 
 def part2(
-    graph: Graph,
+    graph: Graph | CompactGraph,
     start: str = START_PART2,
     end: str = END,
     required: tuple[str, ...] = REQUIRED_PART2,
+    engine: str = "segments",
 ) -> int:
-    """Count paths that must visit all required nodes (any order) using z3.
+    """Count paths that must visit all required nodes (any order).
 
-    Uses a stateful linear system where paths are tracked by which required
-    nodes have been visited so far.
+    ``engine`` is as for ``part1``. The default scales linearly with the
+    number of required nodes; ``"dag"`` and ``"dfs"`` track a visited-set
+    mask and grow as ``2**k``, and z3 needs one integer per ``(node, mask)``
+    pair, so it is mainly useful as a cross-check.
     """
 
-    reachable = _collect_reachable(graph, start)
-    if end not in reachable:
-        return 0
-    _check_for_cycles(graph, start, reachable)
-    return _count_paths_with_required_z3(graph, start, end, reachable, required)
+    return _count_paths(graph, start, end, required, engine)
+
+
+def prepare(lines: list[str]) -> CompactGraph:
+    """Parse and intern the device graph once for both parts."""
+
+    return compile_graph(parse_input(lines))
 
 
 def run(variant: str | None = None) -> None:
-    lines = read_input_lines(YEAR, DAY, variant)
-    graph = parse_input(lines)
+    graph = prepare(read_input_lines(YEAR, DAY, variant))
     print(f"Part 1: {part1(graph)}")
     print(f"Part 2: {part2(graph)}")
 
@@ -1,14 +1,37 @@
 from __future__ import annotations
 
 import re
+import time
 from dataclasses import dataclass
-from functools import lru_cache
+from functools import partial
 from typing import Iterable
 
 from utils.io import read_input_lines
+from utils.parallel import process_map
 
 YEAR = 2025
 DAY = 12
+# Search nodes the dancing-links solver may visit before a region is declared
+# undecided. Nodes cost more as regions grow, so regions above
+# ``_DLX_MAX_CELLS`` get the smaller large-region budget, and regions above
+# ``_DLX_LARGE_MAX_CELLS`` are not searched at all.
+_DLX_MAX_CELLS = 1_000
+_SEARCH_BUDGET = 200_000
+_DLX_LARGE_MAX_CELLS = 2_500
+_LARGE_SEARCH_BUDGET = 20_000
+# Regions up to this many cells try the bitmask search before dancing links.
+# On random small regions it settled some narrow ones several times faster,
+# while dancing links was never far behind and won on every larger region.
+# Those wins took fewer than ``_BITMASK_BUDGET`` nodes; past it, the region
+# goes on to dancing links.
+_BITMASK_MAX_CELLS = 100
+_BITMASK_BUDGET = 50_000
+# Memory for the bitmask search's table of failed states, and a rough size of
+# one entry on top of its occupancy bits.
+_TABLE_BYTES = 32 << 20
+_TABLE_ENTRY_OVERHEAD = 160
+# Default seconds of exact search per region before it is left undecided.
+_REGION_TIMEOUT = 60.0
 
 
 @dataclass(frozen=True)
@@ -170,39 +193,236 @@ def _orientations_from_grid(grid: list[str]) -> list[ShapeOrientation]:
     return out
 
 
+def _base_mask(ori: ShapeOrientation, width: int) -> int:
+    """Bitmask of ``ori`` placed at the top-left corner of a region ``width`` wide."""
+
+    mask = 0
+    for dx, dy in ori.cells:
+        mask |= 1 << (dy * width + dx)
+    return mask
+
+
 def _placements_for_shape(
     orientations: list[ShapeOrientation], width: int, height: int
 ) -> list[int]:
-    """Return all unique placement bitmasks for a shape in a W×H region."""
+    """Return all unique placement bitmasks for a shape in a W×H region.
 
-    masks: set[int] = set()
+    Each orientation's mask is built once and shifted into every position.
+    """
+
+    masks: dict[int, None] = {}
     for ori in orientations:
         if ori.width > width or ori.height > height:
             continue
+        base = _base_mask(ori, width)
         for y0 in range(height - ori.height + 1):
-            base_row = y0 * width
+            row = base << (y0 * width)
             for x0 in range(width - ori.width + 1):
-                m = 0
-                for dx, dy in ori.cells:
-                    idx = (base_row + dy * width) + (x0 + dx)
-                    m |= 1 << idx
-                masks.add(m)
+                masks[row << x0] = None
     return list(masks)
 
 
+class ShapeCatalog:
+    """Per-input precomputation shared by every region.
+
+    Orientations are derived once per shape, and placement masks are cached
+    per ``(shape, width, height)`` so regions of the same size share them.
+    """
+
+    def __init__(self, shapes: dict[int, list[str]]):
+        self.shapes = shapes
+        self._orientations: dict[int, list[ShapeOrientation]] = {}
+        self._placements: dict[tuple[int, int, int], list[int]] = {}
+        self._first_placements: dict[tuple[int, int, int], list[int]] = {}
+
+    def orientations(self, sid: int) -> list[ShapeOrientation]:
+        oris = self._orientations.get(sid)
+        if oris is None:
+            grid = self.shapes.get(sid)
+            if grid is None:
+                raise ValueError(f"Missing shape {sid}")
+            oris = self._orientations[sid] = _orientations_from_grid(grid)
+        return oris
+
+    def area(self, sid: int) -> int:
+        return len(self.orientations(sid)[0].cells)
+
+    def fits_bounds(self, sid: int, width: int, height: int) -> bool:
+        """Whether some orientation of the shape fits inside a W×H region."""
+
+        return any(ori.width <= width and ori.height <= height for ori in self.orientations(sid))
+
+    def placements(self, sid: int, width: int, height: int) -> list[int]:
+        key = (sid, width, height)
+        masks = self._placements.get(key)
+        if masks is None:
+            masks = self._placements[key] = _placements_for_shape(
+                self.orientations(sid), width, height
+            )
+        return masks
+
+    def first_placements(self, sid: int, width: int, height: int) -> list[int]:
+        """Indices into ``placements`` left after breaking the region's symmetry."""
+
+        key = (sid, width, height)
+        keep = self._first_placements.get(key)
+        if keep is None:
+            keep = self._first_placements[key] = _orbit_minimal(
+                self.placements(sid, width, height), width, height
+            )
+        return keep
+
+
+class _TranspositionTable:
+    """Fixed-size table of search states known to fail.
+
+    Each state hashes to one slot of ``keys``. On a collision the entry with
+    more pieces left to place (the bigger subtree, so the costlier one to
+    re-prove) is kept, which bounds memory however long the search runs.
+    Callers hash a state once and probe ``keys[hash(key) & mask]`` directly.
+    """
+
+    def __init__(self, slots: int):
+        size = 1 << max(0, slots.bit_length() - 1)  # round down to a power of two
+        self.mask = size - 1
+        self.keys: list[object] = [None] * size
+        self.depths = [0] * size
+
+    @classmethod
+    def for_budget(cls, budget_bytes: int, entry_bytes: int) -> _TranspositionTable:
+        return cls(max(1, budget_bytes // entry_bytes))
+
+    def __contains__(self, key: object) -> bool:
+        return self.keys[hash(key) & self.mask] == key
+
+    def add(self, key: object, depth: int, slot: int | None = None) -> None:
+        if slot is None:
+            slot = hash(key) & self.mask
+        if self.keys[slot] is None or self.depths[slot] <= depth:
+            self.keys[slot] = key
+            self.depths[slot] = depth
+
+
+class _FreeSpace:
+    """Bitwise flood fills over the free cells of a W×H region."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.full = (1 << (width * height)) - 1
+        first_col = sum(1 << (y * width) for y in range(height))
+        self.not_first_col = self.full & ~first_col
+        self.not_last_col = self.full & ~(first_col << (width - 1))
+
+    def stranded_near(self, occ: int, placed: int, min_piece: int) -> int:
+        """Count free cells in pockets next to ``placed`` smaller than ``min_piece``.
+
+        A pocket can only be closed off by the piece just placed, so the fill
+        starts from that piece's free neighbours. Each fill stops as soon as it
+        reaches ``min_piece`` cells, since a pocket that big is still usable.
+        """
+
+        free = self.full & ~occ
+        width, not_first, not_last = self.width, self.not_first_col, self.not_last_col
+
+        def grow(cells: int) -> int:
+            return (
+                cells
+                | ((cells << 1) & not_first)
+                | ((cells >> 1) & not_last)
+                | (cells << width)
+                | (cells >> width)
+            ) & free
+
+        seeds = grow(placed) & ~placed
+        stranded = 0
+        while seeds:
+            pocket = seeds & -seeds
+            while pocket.bit_count() < min_piece:
+                grown = grow(pocket)
+                if grown == pocket:
+                    stranded += pocket.bit_count()
+                    break
+                pocket = grown
+            seeds &= ~pocket
+        return stranded
+
+
+def _region_symmetries(width: int, height: int) -> list[list[int]]:
+    """Cell permutations for the non-identity symmetries of a W×H region.
+
+    A rectangle has three (two mirrors and the half turn); a square also has
+    the quarter turns and both diagonal mirrors.
+    """
+
+    maps = [
+        lambda x, y: (width - 1 - x, y),
+        lambda x, y: (x, height - 1 - y),
+        lambda x, y: (width - 1 - x, height - 1 - y),
+    ]
+    if width == height:
+        n = width - 1
+        maps += [
+            lambda x, y: (y, x),
+            lambda x, y: (n - y, n - x),
+            lambda x, y: (n - y, x),
+            lambda x, y: (y, n - x),
+        ]
+    perms = []
+    for f in maps:
+        perm = []
+        for cell in range(width * height):
+            tx, ty = f(cell % width, cell // width)
+            perm.append(ty * width + tx)
+        perms.append(perm)
+    return perms
+
+
+def _orbit_minimal(masks: list[int], width: int, height: int) -> list[int]:
+    """Indices of the placements that come first among their symmetric images.
+
+    ``masks`` must hold every placement of a shape (all orientations), so it
+    is closed under the region's symmetries. If the copies of a shape are
+    placed in increasing index order, some mirror image of any packing puts
+    its first copy on one of these placements.
+    """
+
+    index = {mask: i for i, mask in enumerate(masks)}
+    perms = _region_symmetries(width, height)
+    keep = []
+    for i, mask in enumerate(masks):
+        cells = _mask_cells(mask)
+        if all(index[sum(1 << perm[c] for c in cells)] >= i for perm in perms):
+            keep.append(i)
+    return keep
+
+
 def _can_fit_exact(
-    shape_oris: list[list[ShapeOrientation]], region_w: int, region_h: int, counts: list[int]
-) -> bool:
+    catalog: ShapeCatalog,
+    region_w: int,
+    region_h: int,
+    counts: list[int],
+    deadline: float | None = None,
+    budget: int | None = None,
+) -> bool | None:
     """Exact feasibility check via backtracking.
 
-    Intended for small regions / small present counts.
+    Intended for small regions / small present counts. Failed states are kept
+    in a transposition table limited to ``_TABLE_BYTES``. Free cells sealed
+    into pockets too small for any remaining present are counted as stranded,
+    and a state is cut once the other free cells cannot hold the remaining
+    area. Returns None if ``budget`` search nodes do not settle the question,
+    and raises ``TimeoutError`` once ``time.monotonic()`` passes ``deadline``.
+
+    Copies of a shape are interchangeable, so they are placed in increasing
+    placement index, and the first one placed is limited to placements that
+    no symmetry of the region maps to a smaller index.
     """
 
     placements: list[list[int]] = []
     areas: list[int] = []
-    for i, oris in enumerate(shape_oris):
-        areas.append(len(oris[0].cells) if oris else 0)
-        placements.append(_placements_for_shape(oris, region_w, region_h))
+    for i, c in enumerate(counts):
+        areas.append(catalog.area(i))
+        placements.append(catalog.placements(i, region_w, region_h) if c else [])
 
     if any(counts[i] > 0 and not placements[i] for i in range(len(counts))):
         return False
@@ -211,12 +431,35 @@ def _can_fit_exact(
     if total_need > region_w * region_h:
         return False
 
-    counts_t = tuple(counts)
-
-    @lru_cache(maxsize=None)
-    def dfs(occ: int, remaining: tuple[int, ...]) -> bool:
-        if all(c == 0 for c in remaining):
+    cells = region_w * region_h
+    entry_bytes = _TABLE_ENTRY_OVERHEAD + cells // 8 + 8 * len(counts)
+    failed = _TranspositionTable.for_budget(_TABLE_BYTES, entry_bytes)
+    failed_keys, failed_mask = failed.keys, failed.mask
+    space = _FreeSpace(region_w, region_h)
+    nodes = 0
+
+    # ``spare`` is the free area left over once the remaining presents are
+    # placed, minus the stranded cells. A placement uses exactly the area it
+    # takes off the remaining presents, so only new pockets lower it.
+    # ``last[i]`` is the placement index of the latest copy of shape ``i``.
+    def dfs(
+        occ: int, remaining: tuple[int, ...], last: tuple[int, ...], pieces: int, spare: int
+    ) -> bool:
+        nonlocal nodes
+        if pieces == 0:
             return True
+        nodes += 1
+        if budget is not None and nodes > budget:
+            raise _BudgetExceeded
+        if deadline is not None and nodes & 1023 == 0 and time.monotonic() > deadline:
+            raise TimeoutError("Region search ran out of time")
+        key = (occ, remaining, last)
+        slot = hash(key) & failed_mask
+        if failed_keys[slot] == key:
+            return False
+        if spare < 0:
+            failed.add(key, pieces, slot)
+            return False
 
         best_i = -1
         best_valid: list[int] | None = None
@@ -227,12 +470,14 @@ def _can_fit_exact(
             if c == 0:
                 continue
             valid: list[int] = []
-            for m in placements[i]:
-                if m & occ == 0:
-                    valid.append(m)
+            options = placements[i]
+            for j in range(last[i] + 1, len(options)):
+                if options[j] & occ == 0:
+                    valid.append(j)
                     if len(valid) >= best_len:
                         break
             if not valid:
+                failed.add(key, pieces, slot)
                 return False
             if len(valid) < best_len:
                 best_len = len(valid)
@@ -242,65 +487,542 @@ def _can_fit_exact(
                     break
 
         assert best_i >= 0 and best_valid is not None
+        if occ == 0:
+            best_valid = catalog.first_placements(best_i, region_w, region_h)
 
         new_remaining = list(remaining)
         new_remaining[best_i] -= 1
         new_remaining_t = tuple(new_remaining)
+        min_piece = min((areas[i] for i, c in enumerate(new_remaining) if c), default=0)
+        # A pocket holds fewer than ``min_piece`` cells, so pockets are only
+        # looked for once a single one could use up the spare area.
+        check = 1 < min_piece and spare < min_piece - 1
+
+        chosen = placements[best_i]
+        head, tail = last[:best_i], last[best_i + 1 :]
+
+        for j in best_valid:
+            m = chosen[j]
+            nxt = occ | m
+            pockets = space.stranded_near(nxt, m, min_piece) if check else 0
+            if dfs(nxt, new_remaining_t, head + (j,) + tail, pieces - 1, spare - pockets):
+                return True
+        failed.add(key, pieces, slot)
+        return False
+
+    try:
+        return dfs(0, tuple(counts), (-1,) * len(counts), sum(counts), cells - total_need)
+    except _BudgetExceeded:
+        return None
+
+
+class _BudgetExceeded(Exception):
+    pass
+
+
+class RegionUndecided(Exception):
+    """Raised when the exact tiers cannot settle a region within their budget."""
+
+
+class _DancingLinks:
+    """Algorithm X on dancing links over the cells of a region.
+
+    Columns ``1..cells`` are the region's cells and sit in the root list
+    (column ``0``). Each must be covered once, either by a placement or by
+    leaving it as a hole; a region has ``cells`` minus the presents' area
+    holes to spare. The next columns are one per shape and hold every
+    placement of it; a shape's column is covered once all its copies are
+    placed, which removes its remaining placements. Copies are therefore
+    never told apart, so their permutations are never searched.
+
+    A node fails as soon as the dead cells (no placement left) outnumber the
+    holes left, or a shape has fewer placements left than copies to place;
+    cells sealed into pockets too small for any present are dead. The search
+    branches on the cell with the fewest placements, trying the hole last.
+    """
+
+    def __init__(self, cells: int, counts: list[int]):
+        n = cells + len(counts) + 1
+        self.cells = cells
+        self.left = [i - 1 for i in range(n)]
+        self.right = [i + 1 for i in range(n)]
+        self.left[0], self.right[cells] = cells, 0
+        for col in range(cells + 1, n):
+            self.left[col] = self.right[col] = col
+        self.up = list(range(n))
+        self.down = list(range(n))
+        self.column = list(range(n))
+        self.size = [0] * n
+        self.remaining = [0] * (cells + 1) + list(counts)
+        self.groups = [cells + 1 + sid for sid, count in enumerate(counts) if count]
+        self.needed = sum(counts)
+        self.holes = 0
+        self._budget: int | None = None
+        self._deadline: float | None = None
+        self._nodes = 0
+
+    def add_row(self, sid: int, cells: Iterable[int]) -> int:
+        """Add a placement of shape ``sid`` over ``cells`` (0-based); return its first node."""
+
+        left, right, up, down = self.left, self.right, self.up, self.down
+        first = len(left)
+        for col in (self.cells + 1 + sid, *(cell + 1 for cell in cells)):
+            node = len(left)
+            self.column.append(col)
+            up.append(up[col])
+            down.append(col)
+            down[up[col]] = node
+            up[col] = node
+            self.size[col] += 1
+            if node == first:
+                left.append(node)
+                right.append(node)
+            else:
+                left.append(left[first])
+                right.append(first)
+                right[left[first]] = node
+                left[first] = node
+        return first
+
+    def _cover(self, col: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        right[left[col]] = right[col]
+        left[right[col]] = left[col]
+        i = down[col]
+        while i != col:
+            j = right[i]
+            while j != i:
+                up[down[j]] = up[j]
+                down[up[j]] = down[j]
+                size[column[j]] -= 1
+                j = right[j]
+            i = down[i]
+
+    def _uncover(self, col: int) -> None:
+        left, right, up, down, column, size = (
+            self.left,
+            self.right,
+            self.up,
+            self.down,
+            self.column,
+            self.size,
+        )
+        i = up[col]
+        while i != col:
+            j = left[i]
+            while j != i:
+                size[column[j]] += 1
+                up[down[j]] = j
+                down[up[j]] = j
+                j = left[j]
+            i = up[i]
+        right[left[col]] = col
+        left[right[col]] = col
+
+    def _use(self, col: int) -> None:
+        if col <= self.cells:
+            self._cover(col)
+            return
+        self.needed -= 1
+        self.remaining[col] -= 1
+        if not self.remaining[col]:
+            self._cover(col)
+
+    def _unuse(self, col: int) -> None:
+        if col <= self.cells:
+            self._uncover(col)
+            return
+        if not self.remaining[col]:
+            self._uncover(col)
+        self.remaining[col] += 1
+        self.needed += 1
+
+    def _hide(self, row: int) -> None:
+        """Take a row out of its columns without choosing it."""
+
+        j = row
+        while True:
+            self.up[self.down[j]] = self.up[j]
+            self.down[self.up[j]] = self.down[j]
+            self.size[self.column[j]] -= 1
+            j = self.right[j]
+            if j == row:
+                return
+
+    def _unhide(self, row: int) -> None:
+        j = self.left[row]
+        while True:
+            self.size[self.column[j]] += 1
+            self.up[self.down[j]] = j
+            self.down[self.up[j]] = j
+            if j == row:
+                return
+            j = self.left[j]
+
+    def solve(
+        self,
+        holes: int,
+        budget: int | None = None,
+        deadline: float | None = None,
+        leaders: list[int] | None = None,
+        keep: Iterable[int] = (),
+    ) -> bool | None:
+        """Return True if the presents fit leaving at most ``holes`` cells empty.
+
+        ``leaders`` lists the rows of one shape in placement order; the copy
+        of it with the lowest index is then restricted to the ranks in
+        ``keep``. With a ``budget``, give up and return None after visiting
+        that many search nodes. Raises ``TimeoutError`` once
+        ``time.monotonic()`` passes ``deadline``.
+        """
+
+        if holes < 0:
+            return False
+        self.holes = holes
+        self._budget = budget
+        self._deadline = deadline
+        self._nodes = 0
+        try:
+            if leaders is None:
+                return self._search()
+            return self._search_leaders(leaders, set(keep))
+        except _BudgetExceeded:
+            return None
+
+    def _search_leaders(self, rows: list[int], keep: set[int]) -> bool:
+        # Branch on the lowest-index copy of one shape: taking row ``rank``
+        # hides every earlier row of that shape for the rest of the search.
+        found = False
+        hidden = 0
+        for rank, row in enumerate(rows):
+            if rank in keep:
+                j = row
+                while True:
+                    self._use(self.column[j])
+                    j = self.right[j]
+                    if j == row:
+                        break
+                found = self._search()
+                if found:
+                    break
+                j = self.left[row]
+                while True:
+                    self._unuse(self.column[j])
+                    if j == row:
+                        break
+                    j = self.left[j]
+            self._hide(row)
+            hidden += 1
+        if not found:
+            for row in reversed(rows[:hidden]):
+                self._unhide(row)
+        return found
+
+    def _search(self) -> bool:
+        right, down, column, size = self.right, self.down, self.column, self.size
+        if not self.needed:
+            return True
+        if self._budget is not None:
+            self._budget -= 1
+            if self._budget < 0:
+                raise _BudgetExceeded
+        self._nodes += 1
+        if (
+            self._deadline is not None
+            and self._nodes & 1023 == 0
+            and time.monotonic() > self._deadline
+        ):
+            raise TimeoutError("Region search ran out of time")
+
+        remaining = self.remaining
+        for group in self.groups:
+            if size[group] < remaining[group]:
+                return False
 
-        for m in best_valid:
-            if dfs(occ | m, new_remaining_t):
+        # Branch on the cell with the fewest placements; count the dead cells.
+        holes = self.holes
+        best, fewest, dead = 0, len(self.left), 0
+        col = right[0]
+        while col:
+            options = size[col]
+            if options < fewest:
+                best, fewest = col, options
+            if not options:
+                dead += 1
+                if dead > holes:
+                    return False
+            col = right[col]
+        if not best:
+            return False
+
+        self._cover(best)
+        row = down[best]
+        while row != best:
+            j = right[row]
+            while j != row:
+                self._use(column[j])
+                j = right[j]
+            if self._search():
                 return True
+            j = self.left[row]
+            while j != row:
+                self._unuse(column[j])
+                j = self.left[j]
+            row = down[row]
+        if holes:
+            self.holes -= 1
+            found = self._search()
+            self.holes += 1
+            if found:
+                return True
+        self._uncover(best)
+        return False
+
+
+def _mask_cells(mask: int) -> list[int]:
+    cells = []
+    while mask:
+        low = mask & -mask
+        cells.append(low.bit_length() - 1)
+        mask ^= low
+    return cells
+
+
+def _can_fit_dlx(
+    catalog: ShapeCatalog,
+    region_w: int,
+    region_h: int,
+    counts: list[int],
+    budget: int | None = None,
+    deadline: float | None = None,
+) -> bool | None:
+    """Exact feasibility check as an exact cover of the region's cells.
+
+    Every placement is a row over its cells and its shape; see
+    ``_DancingLinks`` for the holes and the pruning. The lowest-index copy
+    of the first shape only gets its ``first_placements``. Returns None if
+    ``budget`` search nodes do not settle the question, and raises
+    ``TimeoutError`` past ``deadline``.
+    """
+
+    cells = region_w * region_h
+    holes = cells - sum(count * catalog.area(sid) for sid, count in enumerate(counts))
+    if holes < 0:
         return False
+    links = _DancingLinks(cells, counts)
+    leaders: list[int] | None = None
+    keep: list[int] = []
+    for sid, count in enumerate(counts):
+        if not count:
+            continue
+        rows = [
+            links.add_row(sid, _mask_cells(mask))
+            for mask in catalog.placements(sid, region_w, region_h)
+        ]
+        if leaders is None:
+            leaders, keep = rows, catalog.first_placements(sid, region_w, region_h)
+    return links.solve(holes, budget, deadline, leaders, keep)
+
+
+def _parity_allows(catalog: ShapeCatalog, region_w: int, region_h: int, counts: list[int]) -> bool:
+    """Necessary condition from a checkerboard colouring of the region.
+
+    A shape covering ``b`` dark and ``l`` light cells covers the same split,
+    or its mirror, wherever it is placed, since rotations and shifts either
+    keep or swap the colours. The presents must be able to choose sides so
+    that neither colour is used more often than the region has it.
+    """
+
+    dark = (region_w * region_h + 1) // 2
+    light = region_w * region_h - dark
+    area = 0
+    imbalances: list[int] = []
+    for sid, count in enumerate(counts):
+        if not count:
+            continue
+        cells = catalog.orientations(sid)[0].cells
+        shape_dark = sum(1 for x, y in cells if (x + y) % 2 == 0)
+        area += count * len(cells)
+        imbalances += [abs(2 * shape_dark - len(cells))] * count
+
+    # Bit i + offset of ``reachable`` is set when the presents can use i more
+    # dark than light cells.
+    offset = sum(imbalances)
+    reachable = 1 << offset
+    for d in imbalances:
+        if d:
+            reachable = (reachable << d) | (reachable >> d)
+    lo, hi = area - 2 * light, 2 * dark - area  # allowed dark-minus-light
+    lo, hi = max(lo, -offset), min(hi, offset)
+    if lo > hi:
+        return False
+    window = ((1 << (hi - lo + 1)) - 1) << (lo + offset)
+    return bool(reachable & window)
+
+
+def _shelf_pack(catalog: ShapeCatalog, region_w: int, region_h: int, counts: list[int]) -> bool:
+    """Sufficient condition: pack the presents' bounding boxes in shelves.
 
-    return dfs(0, counts_t)
+    Boxes are laid left to right in rows as tall as their tallest box,
+    tallest first; every shape takes its flattest orientation that fits the
+    width. Disjoint bounding boxes mean disjoint presents, so success proves
+    the region fits. Both orientations of the region are tried.
+    """
+
+    for width, height, transpose in ((region_w, region_h, False), (region_h, region_w, True)):
+        boxes: list[tuple[int, int]] = []
+        for sid, count in enumerate(counts):
+            if not count:
+                continue
+            dims = {
+                (ori.height, ori.width) if transpose else (ori.width, ori.height)
+                for ori in catalog.orientations(sid)
+            }
+            fitting = [(bh, bw) for bw, bh in dims if bw <= width]
+            if not fitting:
+                break
+            bh, bw = min(fitting)
+            boxes += [(bh, bw)] * count
+        else:
+            boxes.sort(reverse=True)
+            x = y = shelf = 0
+            for bh, bw in boxes:
+                if x + bw > width:
+                    x, y, shelf = 0, y + shelf, 0
+                if y + bh > height:
+                    break
+                x += bw
+                shelf = max(shelf, bh)
+            else:
+                return True
+    return False
 
 
-def can_fit_region(shapes: dict[int, list[str]], region: tuple[int, int, list[int]]) -> bool:
+def can_fit_region(
+    shapes: dict[int, list[str]],
+    region: tuple[int, int, list[int]],
+    catalog: ShapeCatalog | None = None,
+    timeout: float | None = None,
+) -> bool:
     """Return True if a region can fit all requested presents.
 
-    This uses an exact solver for small regions; for large regions it uses a
-    fast check based on occupied area (and per-shape fit) which is adequate for
-    the provided 2025 Day 12 input sizes.
+    Decides in tiers, cheapest first: necessary conditions (bounding boxes,
+    area, checkerboard parity) prove a misfit, shelf-packing the bounding
+    boxes proves a fit, and only regions left ambiguous reach an exact
+    search: the dancing-links solver, with a node budget that shrinks as the
+    region grows. Regions of at most ``_BITMASK_MAX_CELLS`` cells first get
+    ``_BITMASK_BUDGET`` nodes of the memoised bitmask search. Every exact
+    search is bounded by its node budget, so the call always returns or
+    raises: ``RegionUndecided`` when the budgets run out (or the region is
+    too large to search), and ``TimeoutError`` when the exact search runs
+    longer than ``timeout`` seconds. Pass a ``catalog`` built from
+    ``shapes`` to share orientations and placements between regions.
     """
 
+    if catalog is None:
+        catalog = ShapeCatalog(shapes)
     w, h, counts = region
     n_shapes = len(counts)
 
-    # Precompute orientations and areas.
-    shape_oris: list[list[ShapeOrientation]] = []
-    areas: list[int] = []
-    min_bounds_ok = True
     for sid in range(n_shapes):
-        grid = shapes.get(sid)
-        if grid is None:
-            raise ValueError(f"Missing shape {sid}")
-        oris = _orientations_from_grid(grid)
-        shape_oris.append(oris)
-        areas.append(len(oris[0].cells))
-        if counts[sid] > 0 and all(ori.width > w or ori.height > h for ori in oris):
-            min_bounds_ok = False
-
-    if not min_bounds_ok:
-        return False
+        if counts[sid] > 0 and not catalog.fits_bounds(sid, w, h):
+            return False
 
-    total_need = sum(counts[i] * areas[i] for i in range(n_shapes))
+    total_need = sum(counts[i] * catalog.area(i) for i in range(n_shapes))
     if total_need > w * h:
         return False
+    if not _parity_allows(catalog, w, h, counts):
+        return False
+    if _shelf_pack(catalog, w, h, counts):
+        return True
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    if (w * h) <= _BITMASK_MAX_CELLS:
+        fits = _can_fit_exact(catalog, w, h, counts, deadline, _BITMASK_BUDGET)
+        if fits is not None:
+            return fits
+    if (w * h) <= _DLX_LARGE_MAX_CELLS:
+        budget = _SEARCH_BUDGET if (w * h) <= _DLX_MAX_CELLS else _LARGE_SEARCH_BUDGET
+        fits = _can_fit_dlx(catalog, w, h, counts, budget, deadline)
+        if fits is not None:
+            return fits
+    raise RegionUndecided(f"Could not decide whether the {w}x{h} region {counts} fits")
 
-    total_pieces = sum(counts)
 
-    # Exact solver threshold: keep it conservative; sample and small custom tests go here.
-    if (w * h) <= 220 and total_pieces <= 14:
-        return _can_fit_exact(shape_oris, w, h, counts)
+# Catalog for the regions decided in this process, set once per worker.
+_worker_catalog: ShapeCatalog | None = None
 
-    # Large regions: area/bounds check only.
-    return True
 
+def _init_worker(shapes: dict[int, list[str]]) -> None:
+    global _worker_catalog
+    _worker_catalog = ShapeCatalog(shapes)
 
-def part1(parsed: ParsedInput) -> int:
-    """Count how many regions can fit all requested presents."""
 
-    return sum(1 for region in parsed.regions if can_fit_region(parsed.shapes, region))
+def _decide_region(region: tuple[int, int, list[int]], timeout: float | None) -> bool | None:
+    assert _worker_catalog is not None
+    try:
+        return can_fit_region(_worker_catalog.shapes, region, _worker_catalog, timeout)
+    except (RegionUndecided, TimeoutError):
+        return None
+
+
+def _region_cost(region: tuple[int, int, list[int]]) -> int:
+    """Scheduling key: regions with more presents and more cells go first."""
+
+    w, h, counts = region
+    return sum(counts) * w * h
+
+
+def evaluate_regions(
+    parsed: ParsedInput, workers: int | None = 1, timeout: float | None = _REGION_TIMEOUT
+) -> list[bool | None]:
+    """Decide every region, in input order; None marks an undecided region.
+
+    ``workers`` > 1 spreads the regions over a process pool (``None`` uses
+    every CPU). The shapes are sent to each worker once, and the costliest
+    regions are started first. A region is left undecided when its exact
+    search exceeds ``timeout`` seconds (``None`` for no limit) or its node
+    budget.
+    """
+
+    return process_map(
+        partial(_decide_region, timeout=timeout),
+        parsed.regions,
+        workers,
+        priority=_region_cost,
+        initializer=_init_worker,
+        initargs=(parsed.shapes,),
+    )
+
+
+def part1(
+    parsed: ParsedInput,
+    workers: int | None = 1,
+    timeout: float | None = _REGION_TIMEOUT,
+    count_undecided: bool = False,
+) -> int:
+    """Count how many regions can fit all requested presents.
+
+    ``workers`` and ``timeout`` behave as in ``evaluate_regions``. The count
+    is exact unless a region is left undecided, which raises
+    ``RegionUndecided``. With ``count_undecided`` such regions are counted as
+    fitting instead: each has passed every necessary check (bounding boxes,
+    area and parity), as the area check alone did for large regions before
+    the exact tiers existed, but the count is then only an upper bound.
+    """
+
+    fits = evaluate_regions(parsed, workers, timeout)
+    undecided = [i for i, fit in enumerate(fits) if fit is None]
+    if undecided and not count_undecided:
+        raise RegionUndecided(f"Could not decide whether regions {undecided} fit")
+    return sum(1 for fit in fits if fit is not False)
 
 
 def part2(parsed: ParsedInput) -> int:
@@ -312,7 +1034,11 @@ def part2(parsed: ParsedInput) -> int:
 def run(variant: str | None = None) -> None:
     lines = read_input_lines(YEAR, DAY, variant)
     parsed = parse_input(lines)
-    print(f"Solution: {part1(parsed)}")
+    fits = evaluate_regions(parsed, workers=None, timeout=_REGION_TIMEOUT)
+    print(f"Solution: {sum(1 for fit in fits if fit is not False)}")
+    undecided = fits.count(None)
+    if undecided:
+        print(f"Undecided regions counted as fitting (an upper bound): {undecided}")
 
 
 if __name__ == "__main__":
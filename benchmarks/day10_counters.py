@@ -0,0 +1,82 @@
+"""Compare the Day 10 part 2 engines on generated machine sets.
+
+Usage: ``uv run python benchmarks/day10_counters.py [--machines N] [--scale K]``
+
+Machines are generated like the puzzle's: random buttons over a handful of
+counters, with targets produced by pressing each button a random number of
+times, so every machine is solvable. Buttons touch anywhere from one counter
+to all of them, and a machine has up to twice as many buttons as counters,
+so it can have many free buttons. ``--scale`` multiplies the number of
+counters and buttons.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from importlib import util
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DAY10_PATH = PROJECT_ROOT / "2025" / "10" / "main.py"
+
+
+def load_day10_module():
+    spec = util.spec_from_file_location("aoc2025_day10", DAY10_PATH)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {DAY10_PATH}")
+    module = util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_machines(count: int, scale: int, seed: int) -> list[tuple[list[int], list[list[int]]]]:
+    rng = random.Random(seed)
+    machines = []
+    for _ in range(count):
+        m = rng.randint(4, 10) * scale
+        n = rng.randint(m - 2, 2 * m)
+        buttons = [sorted(rng.sample(range(m), rng.randint(1, m))) for _ in range(n)]
+        presses = [rng.randint(0, 30) for _ in range(n)]
+        targets = [0] * m
+        for idxs, x in zip(buttons, presses):
+            for i in idxs:
+                targets[i] += x
+        machines.append((targets, buttons))
+    return machines
+
+
+def bench(day10, machines, engine: str) -> tuple[list[int], float]:
+    start = time.perf_counter()
+    answers = [day10._min_presses_counters(t, b, engine) for t, b in machines]
+    return answers, time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--machines", type=int, default=200)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=10)
+    args = parser.parse_args()
+
+    day10 = load_day10_module()
+    machines = generate_machines(args.machines, args.scale, args.seed)
+    native, native_time = bench(day10, machines, "native")
+    print(f"native: {native_time:.3f}s")
+    if day10.z3 is None:
+        print("z3: not installed, skipped")
+        return
+    reference, z3_time = bench(day10, machines, "z3")
+    print(f"z3:     {z3_time:.3f}s")
+    auto, auto_time = bench(day10, machines, "auto")
+    print(f"auto:   {auto_time:.3f}s")
+    mismatches = sum(a != b or c != b for a, b, c in zip(native, reference, auto))
+    if mismatches:
+        raise SystemExit(f"{mismatches} machines disagree between engines")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""Compare the Day 11 path-counting engines on generated device graphs.
+
+Usage: ``uv run python benchmarks/day11_paths.py [--nodes N ...] [--engines segments dag dfs z3]``
+
+Graphs are layered DAGs: every device links to two or three devices in the
+next few layers, ``svr`` and ``you`` sit in the first layer, ``dac`` and
+``fft`` in the middle and every device in the last layer feeds ``out``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import sys
+import time
+from importlib import util
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+DAY11_PATH = PROJECT_ROOT / "2025" / "11" / "main.py"
+
+
+def load_day11_module():
+    spec = util.spec_from_file_location("aoc2025_day11", DAY11_PATH)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {DAY11_PATH}")
+    module = util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def generate_graph(nodes: int, seed: int, width: int = 40) -> dict[str, list[str]]:
+    rng = random.Random(seed)
+    layers = [
+        [f"n{i}" for i in range(start, min(start + width, nodes))]
+        for start in range(0, nodes, width)
+    ]
+    layers[0][:2] = ["svr", "you"]
+    middle = layers[len(layers) // 2]
+    middle[:2] = ["dac", "fft"]
+    graph: dict[str, list[str]] = {}
+    for depth, layer in enumerate(layers[:-1]):
+        ahead = [name for later in layers[depth + 1 : depth + 4] for name in later]
+        for name in layer:
+            graph[name] = rng.sample(ahead, min(len(ahead), rng.randint(2, 3)))
+    for name in layers[-1]:
+        graph[name] = ["out"]
+    return graph
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--engines", nargs="+", default=["segments", "dag", "dfs", "z3"])
+    parser.add_argument("--seed", type=int, default=11)
+    parser.add_argument(
+        "--z3-max-nodes",
+        type=int,
+        default=2_000,
+        help="skip z3 on larger graphs (its model grows with nodes x masks)",
+    )
+    args = parser.parse_args()
+
+    day11 = load_day11_module()
+    for nodes in args.nodes:
+        graph = generate_graph(nodes, args.seed)
+        answers = {}
+        for engine in args.engines:
+            if engine == "z3" and day11.z3 is None:
+                print(f"{nodes:>7} nodes  z3: not installed, skipped")
+                continue
+            if engine == "z3" and nodes > args.z3_max_nodes:
+                print(f"{nodes:>7} nodes  z3: skipped (over --z3-max-nodes)")
+                continue
+            start = time.perf_counter()
+            answers[engine] = (day11.part1(graph, engine=engine), day11.part2(graph, engine=engine))
+            elapsed = time.perf_counter() - start
+            print(f"{nodes:>7} nodes  {engine}: {elapsed:.3f}s")
+        if len(set(answers.values())) > 1:
+            raise SystemExit(f"Engines disagree on {nodes} nodes: {answers}")
+
+
+if __name__ == "__main__":
+    main()
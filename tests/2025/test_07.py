@@ -54,3 +54,22 @@ def test_timelines_preserved_on_merge():
     # into the center column; quantum timelines add rather than merge.
     assert day07.part1(diagram) == 3
     assert day07.part2(diagram) == 2
+
+
+def test_streamed_jagged_rows_match_padded_grid():
+    jagged = [
+        "..S",
+        "",
+        "..^",
+        ".",
+        ".^.^",
+    ]
+    padded = [row.ljust(4, ".") for row in jagged]
+
+    # A one-shot iterator is enough; rows shorter than the widest one behave as
+    # if padded with empty space.
+    assert day07.part1(iter(jagged)) == day07.part1(padded) == 3
+    assert day07.part2(iter(jagged)) == day07.part2(padded) == 3
+
+    manifold = day07.parse_input(jagged)
+    assert manifold.splitters == {1: [4], 2: [2], 3: [4]}
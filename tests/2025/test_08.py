@@ -1,7 +1,12 @@
+import random
 import sys
+from collections import Counter
 from importlib import util
+from itertools import islice
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DAY08_PATH = PROJECT_ROOT / "2025" / "08" / "main.py"
 
@@ -50,6 +55,23 @@ def test_example_matches_described_product():
     assert day08.part2(points) == 25_272
 
 
+def test_circuit_result_keeps_sizes_and_histogram(monkeypatch):
+    def no_rescan(self):
+        raise AssertionError("component sizes should not be listed")
+
+    points = day08.parse_input(EXAMPLE_INPUT)
+    monkeypatch.setattr(day08.DisjointSet, "component_sizes", no_rescan)
+    result = day08.connect_closest(points, 10, day08.squared_euclidean)
+    assert result.top_three_product == 40
+    assert result.sizes[:3] == [5, 4, 2]
+    assert sum(result.sizes) == len(points)
+    assert result.size_counts == dict(Counter(result.sizes))
+
+    legacy = day08.CircuitResult([2, 5, 1, 3])
+    assert legacy.size_counts == {1: 1, 2: 1, 3: 1, 5: 1}
+    assert legacy.top_three_product == 30
+
+
 def test_last_connection_product_simple_triangle():
     points = [
         (0, 0, 0),
@@ -60,3 +82,63 @@ def test_last_connection_product_simple_triangle():
     # Closest edges are (0,1) and (0,2) both with distance 10; the second of those
     # completes connectivity, producing product 0 * 0 = 0.
     assert day08.part2(points) == 0
+
+
+def test_closest_pairs_match_full_sort_including_ties():
+    rng = random.Random(8)
+    # A tiny coordinate range forces duplicate points and many equal distances.
+    points = [tuple(rng.randint(0, 4) for _ in range(3)) for _ in range(60)]
+
+    for metric in (day08.squared_euclidean, day08.manhattan):
+        expected = day08._sorted_edges(points, metric)
+        assert list(islice(day08._closest_pairs(points, metric), 500)) == expected[:500]
+
+
+def test_custom_distance_falls_back_to_sorted_edges():
+    points = day08.parse_input(EXAMPLE_INPUT)
+
+    def chebyshev(a, b):
+        return max(abs(a[0] - b[0]), abs(a[1] - b[1]), abs(a[2] - b[2]))
+
+    expected = day08._sorted_edges(points, chebyshev)
+    assert list(day08._closest_pairs(points, chebyshev)) == expected
+
+
+def _kruskal_last_edge(points, metric):
+    dsu = day08.DisjointSet(len(points))
+    last = None
+    for edge in day08._sorted_edges(points, metric):
+        _, i, j = edge
+        if dsu.find(i) != dsu.find(j):
+            dsu.union(i, j)
+            last = edge
+    return last
+
+
+def test_mst_methods_agree_with_sorted_kruskal_on_ties():
+    rng = random.Random(28)
+    for _ in range(20):
+        points = [tuple(rng.randint(0, 3) for _ in range(3)) for _ in range(rng.randint(2, 50))]
+        for metric in (day08.squared_euclidean, day08.manhattan):
+            expected = _kruskal_last_edge(points, metric)
+            for method in ("prim", "boruvka"):
+                tree = day08.minimum_spanning_tree(points, metric, method)
+                assert len(tree) == len(points) - 1
+                assert max(tree) == expected
+
+
+def test_boruvka_rejects_custom_distance():
+    with pytest.raises(ValueError):
+        day08.minimum_spanning_tree([(0, 0, 0), (1, 1, 1)], lambda a, b: 0, "boruvka")
+
+
+def test_blocked_top_k_matches_full_sort_across_tiles(monkeypatch):
+    rng = random.Random(29)
+    points = [tuple(rng.randint(0, 5) for _ in range(3)) for _ in range(40)]
+    # Tiny tiles force many blocks and cross-block merging of tied distances.
+    monkeypatch.setattr(day08, "_TILE_SIZE", 50)
+
+    for metric in (day08.squared_euclidean, day08.manhattan):
+        expected = day08._sorted_edges(points, metric)
+        for k in (0, 1, 37, len(expected), len(expected) + 5):
+            assert day08._closest_pairs_blocked(points, k, metric) == expected[:k]
@@ -1,7 +1,10 @@
+import random
 import sys
 from importlib import util
 from pathlib import Path
 
+import pytest
+
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 DAY09_PATH = PROJECT_ROOT / "2025" / "09" / "main.py"
 
@@ -54,3 +57,95 @@ def test_concave_shape_blocks_outside_rectangles():
     assert day09.part1(concave) == 25
     # Green-limited rectangle cannot cover the missing quadrant; expect smaller area.
     assert day09.part2(concave) < 25
+
+
+def _brute_force_green(points):
+    """Reference: test every tile of every candidate rectangle individually."""
+
+    n = len(points)
+    edges = [(points[k], points[(k + 1) % n]) for k in range(n)]
+
+    def allowed(x, y):
+        inside = False
+        for (x1, y1), (x2, y2) in edges:
+            if min(x1, x2) <= x <= max(x1, x2) and min(y1, y2) <= y <= max(y1, y2):
+                return True  # on the boundary
+            # Cast the ray along y = y + 0.5 towards +x across vertical edges.
+            if x1 == x2 and x1 > x and min(y1, y2) <= y < max(y1, y2):
+                inside = not inside
+        return inside
+
+    best = 0
+    for i in range(n):
+        for j in range(i + 1, n):
+            (x1, y1), (x2, y2) = points[i], points[j]
+            if x1 == x2 or y1 == y2:
+                continue
+            xs = range(min(x1, x2), max(x1, x2) + 1)
+            ys = range(min(y1, y2), max(y1, y2) + 1)
+            if all(allowed(x, y) for x in xs for y in ys):
+                best = max(best, len(xs) * len(ys))
+    return best
+
+
+def test_scanline_fill_matches_brute_force_on_comb():
+    comb = [
+        (0, 0),
+        (10, 0),
+        (10, 6),
+        (8, 6),
+        (8, 2),
+        (6, 2),
+        (6, 6),
+        (4, 6),
+        (4, 2),
+        (2, 2),
+        (2, 6),
+        (0, 6),
+    ]
+    for shape in (comb, list(reversed(comb)), day09.parse_input(SAMPLE_INPUT)):
+        assert day09.part2(shape) == _brute_force_green(shape)
+
+
+def test_inside_tree_matches_brute_force_on_skylines():
+    rng = random.Random(9)
+    for _ in range(60):
+        # A skyline over a flat base: adjacent columns of different heights,
+        # some only one tile apart, give many concave corners.
+        k = rng.randint(1, 6)
+        xs = sorted(rng.sample(range(12), k + 1))
+        heights = [rng.randint(1, 8) for _ in range(k)]
+        shape = [(xs[0], 0), (xs[0], heights[0])]
+        for i in range(1, k):
+            if heights[i] != heights[i - 1]:
+                shape += [(xs[i], heights[i - 1]), (xs[i], heights[i])]
+        shape += [(xs[k], heights[-1]), (xs[k], 0)]
+        if rng.random() < 0.5:
+            shape = [(y, x) for x, y in shape]
+        assert day09.part2(shape) == _brute_force_green(shape)
+
+
+def test_diagonal_edges_are_rejected():
+    with pytest.raises(ValueError):
+        day09.part2([(0, 0), (4, 0), (2, 3)])
+
+
+def test_batched_search_matches_single_batch(monkeypatch):
+    points = day09.parse_input(SAMPLE_INPUT)
+    expected = day09.part2(points)
+    # One candidate row per batch exercises the early-exit bound between batches.
+    monkeypatch.setattr(day09, "_BATCH_SIZE", 1)
+    assert day09.part2(points) == expected == 24
+
+
+def test_two_corner_search_matches_all_pairs():
+    rng = random.Random(33)
+    for _ in range(200):
+        # Small ranges produce duplicates and shared rows/columns.
+        points = [(rng.randint(0, 6), rng.randint(0, 6)) for _ in range(rng.randint(0, 15))]
+        expected = 0
+        for i, (x1, y1) in enumerate(points):
+            for x2, y2 in points[i + 1 :]:
+                if x1 != x2 and y1 != y2:
+                    expected = max(expected, (abs(x1 - x2) + 1) * (abs(y1 - y2) + 1))
+        assert day09.part1(points) == expected
@@ -1,7 +1,9 @@
+import random
 import sys
 from importlib import util
 from pathlib import Path
 
+import pytest
 from utils.io import read_input_lines
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -36,3 +38,264 @@ def test_single_button_machine():
 def test_combo_button_shortcut():
     machines = day10.parse_input(["[##] (0) (1) (0,1) {1,1}"])
     assert day10.part1(machines) == 1
+
+
+def _brute_force_presses(target, buttons):
+    best = None
+    for subset in range(1 << len(buttons)):
+        state = 0
+        for j, mask in enumerate(buttons):
+            if subset >> j & 1:
+                state ^= mask
+        if state == target and (best is None or subset.bit_count() < best):
+            best = subset.bit_count()
+    return best
+
+
+def test_gf2_solver_matches_brute_force():
+    rng = random.Random(34)
+    for _ in range(300):
+        lights = rng.randint(1, 6)
+        buttons = [rng.getrandbits(lights) for _ in range(rng.randint(1, 10))]
+        target = rng.getrandbits(lights)
+        expected = _brute_force_presses(target, buttons)
+        if expected is None:
+            with pytest.raises(ValueError):
+                day10._min_presses(target, buttons)
+        else:
+            assert day10._min_presses(target, buttons) == expected
+
+
+def test_many_buttons_stay_tractable():
+    # 64 buttons over 10 lights: the nullspace has 54 dimensions, far beyond
+    # what enumerating every button subset could handle.
+    rng = random.Random(10)
+    singles = [1 << i for i in range(10)]
+    buttons = [rng.getrandbits(10) | rng.getrandbits(10) for _ in range(54)] + singles
+    assert day10._min_presses(0b1111111111, buttons) == 1
+    assert day10._min_presses(0b1111111111, singles) == 10
+
+
+def test_native_counter_engine_matches_z3():
+    rng = random.Random(35)
+    for _ in range(150):
+        m = rng.randint(1, 6)
+        buttons = [rng.sample(range(m), rng.randint(1, m)) for _ in range(rng.randint(1, 8))]
+        if rng.random() < 0.8:
+            targets = [0] * m
+            for idxs in buttons:
+                presses = rng.randint(0, 12)
+                for i in idxs:
+                    targets[i] += presses
+        else:  # often unreachable
+            targets = [rng.randint(0, 20) for _ in range(m)]
+        expected = day10._min_presses_counters(targets, buttons, engine="z3")
+        assert day10._min_presses_counters(targets, buttons, engine="native") == expected
+
+
+def test_native_counter_engine_edge_cases():
+    # Duplicate buttons and a button blocked by a zero target.
+    assert day10._min_presses_counters([3, 0], [[0], [0], [0, 1]]) == 3
+    assert day10._min_presses_counters([1, 2], [[0, 1]]) == day10.INF
+    with pytest.raises(ValueError):
+        day10._min_presses_counters([1], [[0]], engine="simplex")
+
+
+def test_lp_bound_settles_many_free_buttons():
+    # Six free buttons: the search used to run for minutes before finding any
+    # solution, while the LP relaxation already bounds the answer at 150.
+    targets = [111, 150, 117, 89, 105, 103, 109]
+    buttons = [
+        [0, 2, 4],
+        [0, 2, 3, 4, 5],
+        [1, 2, 3, 4, 5],
+        [0, 1, 2, 3, 4, 6],
+        [1, 5],
+        [1, 3, 5, 6],
+        [0, 1, 2, 4, 5],
+        [0, 1, 2, 3, 4, 5, 6],
+        [2],
+        [0, 1, 2, 3, 6],
+        [1, 5, 6],
+        [0, 2, 3, 4, 6],
+        [1, 4],
+    ]
+    assert day10._min_presses_counters(targets, buttons, engine="native", timeout=5) == 150
+
+
+def test_lagrange_floor_bounds_and_refutes():
+    vectors = [[1, 1], [1, 0], [0, 1]]
+    touches = [[0, 1], [0], [1]]
+    prices, feasible = day10._lp_prices([3, 5], vectors, [3, 3, 5])
+    assert feasible
+    assert day10._lagrange_floor(prices, 1.0, [3, 5], touches) == pytest.approx(5)
+    # Nothing can raise counter 1 beyond counter 0 when only the pair exists.
+    prices, feasible = day10._lp_prices([3, 5], vectors[:1], [3])
+    assert not feasible
+    assert day10._lagrange_floor(prices, 0.0, [3, 5], touches[:1]) > 0
+
+
+def test_auto_engine_sends_many_free_buttons_to_z3(monkeypatch):
+    used = []
+    for name in ("native", "z3"):
+        solve = day10._COUNTER_ENGINES[name]
+        monkeypatch.setitem(
+            day10._COUNTER_ENGINES,
+            name,
+            lambda t, v, timeout=None, name=name, solve=solve: used.append(name) or solve(t, v),
+        )
+    assert day10._min_presses_counters([3, 5], [[0, 1], [0], [1]]) == 5
+    # Every non-empty subset of four counters: 15 buttons, 11 of them free.
+    subsets = [[i for i in range(4) if mask >> i & 1] for mask in range(1, 16)]
+    assert day10._min_presses_counters([20, 20, 20, 20], subsets) == 20
+    expected = "z3" if day10.z3 is not None else "native"
+    assert used == ["native", expected]
+
+
+def test_parallel_parts_match_serial():
+    rng = random.Random(36)
+    lines = []
+    for _ in range(12):
+        m = rng.randint(3, 6)
+        buttons = [rng.sample(range(m), rng.randint(1, m)) for _ in range(rng.randint(m, m + 3))]
+        targets = [0] * m
+        for idxs in buttons:
+            presses = rng.randint(0, 20)
+            for i in idxs:
+                targets[i] += presses
+        lit = set()
+        for idxs in rng.sample(buttons, rng.randint(0, len(buttons))):
+            lit ^= set(idxs)
+        diagram = "".join("#" if i in lit else "." for i in range(m))
+        button_text = " ".join("(" + ",".join(map(str, idxs)) + ")" for idxs in buttons)
+        lines.append(f"[{diagram}] {button_text} {{{','.join(map(str, targets))}}}")
+    machines = day10.parse_input(lines)
+    assert day10.part1(machines, workers=3) == day10.part1(machines)
+    assert day10.part2(machines, workers=3) == day10.part2(machines)
+
+
+def test_pool_only_for_large_inputs(monkeypatch):
+    calls = []
+
+    def record(func, items, workers, chunksize, priority):
+        calls.append((len(items), workers, chunksize))
+        return [func(item) for item in items]
+
+    monkeypatch.setattr(day10, "process_map", record)
+    monkeypatch.setattr(day10.os, "cpu_count", lambda: 4)
+    forms = [((1,), ((0,),))] * 100
+    day10._solve_pending(day10._solve_lights, forms[:5], None)
+    day10._solve_pending(day10._solve_lights, forms, None)
+    assert calls == [(5, 1, 1), (100, 4, 6)]
+
+
+def test_counter_timeout():
+    machines = day10.parse_input(["[...] (0,1) (1,2) (0,2) (0) (1) (2) {40,50,60}"])
+    with pytest.raises(TimeoutError):
+        day10._min_presses_counters(
+            [40, 50, 60], [[0, 1], [1, 2], [0, 2], [0], [1], [2]], timeout=0
+        )
+    assert day10.part2(machines, timeout=10) == day10.part2(machines, engine="z3")
+
+
+def _slow_on(target, solve):
+    def engine(targets, vectors, timeout=None):
+        if target in targets:
+            raise TimeoutError("too slow")
+        return solve(targets, vectors, timeout)
+
+    return engine
+
+
+def test_timeout_retries_only_the_slow_machine(monkeypatch, tmp_path):
+    from utils.cache import PersistentLRU
+
+    machines = day10.parse_input(
+        ["[...] (0,1) (1,2) (0,2) (0) (1) (2) {40,50,60}", "[##.] (0) (1,2) (0,2) {5,3,6}"]
+    )
+    expected = [day10.part2([machine]) for machine in machines]
+    native = day10._COUNTER_ENGINES["native"]
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "native", _slow_on(60, native))
+
+    # The other engine rescues the machine that timed out.
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "z3", native)
+    assert day10.part2(machines, timeout=1) == sum(expected)
+
+    # When the retry times out too, only that machine is reported and the
+    # rest are cached, so a rerun repeats just the slow one.
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "z3", _slow_on(60, native))
+    cache = PersistentLRU(path=tmp_path / "day10.json")
+    with pytest.raises(TimeoutError, match=r"Machines \[0\]"):
+        day10.part2(machines, timeout=1, cache=cache)
+    assert len(cache) == 1
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "native", native)
+    assert day10.part2(machines, cache=cache) == sum(expected)
+
+
+def test_run_bounds_each_machine_and_falls_back(monkeypatch, tmp_path, capsys):
+    sample = read_input_lines(2025, 10, variant="sample")
+    expected = day10.part2(day10.parse_input(sample))
+    native = day10._COUNTER_ENGINES["native"]
+    calls = []
+
+    def stuck(targets, vectors, timeout=None):
+        calls.append(("native", timeout))
+        raise TimeoutError("too slow")
+
+    def rescue(targets, vectors, timeout=None):
+        calls.append(("z3", timeout))
+        return native(targets, vectors, timeout)
+
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "native", stuck)
+    monkeypatch.setitem(day10._COUNTER_ENGINES, "z3", rescue)
+    monkeypatch.setattr(day10, "read_input_lines", lambda year, day, variant=None: sample)
+    monkeypatch.setattr(day10, "cache_path", lambda name: tmp_path / f"{name}.json")
+    day10.run()
+    assert f"Part 2: {expected}" in capsys.readouterr().out
+    assert calls and all(timeout == day10._MACHINE_TIMEOUT for _, timeout in calls)
+    assert {engine for engine, _ in calls} == {"native", "z3"}
+
+
+def test_machine_without_targets_needs_no_presses():
+    machines = day10.parse_input(["[.#] (0) (1)", "[##.] (0) (1,2) (0,2) {5,3,6}"])
+    assert day10.part2(machines[:1]) == 0
+    assert day10.part2(machines) == day10.part2(machines[1:])
+
+
+def test_canonical_form_ignores_order():
+    a = day10.parse_input(["[#.#.] (0,1) (1,2,3) (0,1) (3) {7,9,4,6}"])[0]
+    b = day10.parse_input(["[.#.#] (0) (0,1,2) (2,3) {6,4,9,7}"])[0]
+    assert day10._counters_form(a) == day10._counters_form(b)
+    assert day10._lights_form(a) == day10._lights_form(b)
+    assert day10.part2([a]) == day10.part2([b])
+
+
+def test_cache_answers_equivalent_machines(tmp_path):
+    from utils.cache import PersistentLRU
+
+    machines = day10.parse_input(["[##.] (0) (1,2) (0,2) {5,3,6}", "[.##] (2,0) (0,1) (2) {6,3,5}"])
+    cache = PersistentLRU(path=tmp_path / "day10.json")
+    expected = day10.part2(machines)
+    assert day10.part2(machines, cache=cache) == expected
+    assert len(cache) == 1
+    cache.save()
+
+    # Every answer now comes from the cache, so no search runs at all.
+    reloaded = PersistentLRU(path=tmp_path / "day10.json")
+    assert day10.part2(machines, timeout=0, cache=reloaded) == expected
+    assert day10.part1(machines, cache=reloaded) == day10.part1(machines)
+
+
+def test_cache_key_tracks_engine_and_solver_source(tmp_path, monkeypatch):
+    from utils.cache import PersistentLRU
+
+    machines = day10.parse_input(["[##.] (0) (1,2) (0,2) {5,3,6}"])
+    cache = PersistentLRU(path=tmp_path / "day10.json")
+    day10.part2(machines, cache=cache)
+    day10.part2(machines, engine="z3", cache=cache)
+    assert len(cache) == 2
+
+    # An edited solver file must not reuse answers cached by the old one.
+    monkeypatch.setattr(day10, "_SOURCE_HASH", "edited")
+    day10.part2(machines, cache=cache)
+    assert len(cache) == 3
@@ -1,3 +1,4 @@
+import random
 import sys
 from importlib import util
 from pathlib import Path
@@ -62,3 +63,119 @@ def test_cycle_detection():
         day11.part1(graph)
     with pytest.raises(ValueError):
         day11.part2(graph, start="you")
+
+
+@pytest.mark.parametrize("engine", ["segments", "dag", "dfs", "z3"])
+def test_unknown_devices_keep_original_results(engine):
+    graph = day11.parse_input(["svr: a", "a: b out", "b: a", "out:"])
+    # An unknown start reaches only itself, so it is its own single path.
+    assert day11.part1(graph, start="lab", end="lab", engine=engine) == 1
+    assert day11.part1(graph, start="lab", end="out", engine=engine) == 0
+    # The cycle is still reported even though the required device is unknown.
+    with pytest.raises(ValueError):
+        day11.part2(graph, required=("nope",), engine=engine)
+
+    counter = day11.PathCounter(day11.parse_input(["svr: out", "out:"]))
+    assert counter.count("lab", "lab") == 1
+    assert counter.count("lab", "lab", ("svr",)) == 0
+    assert counter.count("svr", "out", ("nope",)) == 0
+
+
+def _random_dag(rng, nodes):
+    names = ["svr", "you", "dac", "fft"] + [f"n{i}" for i in range(nodes - 5)] + ["out"]
+    rng.shuffle(names)
+    names.remove("out")
+    names.append("out")
+    graph = {}
+    for i, name in enumerate(names[:-1]):
+        later = names[i + 1 :]
+        graph[name] = rng.sample(later, min(len(later), rng.randint(0, 3)))
+    return graph
+
+
+@pytest.mark.parametrize("engine", ["dag", "dfs", "z3"])
+def test_engines_agree_with_dag(engine):
+    rng = random.Random(38)
+    for _ in range(30):
+        graph = _random_dag(rng, rng.randint(6, 14))
+        for start in ("svr", "you"):
+            assert day11.part1(graph, start=start, engine=engine) == day11.part1(graph, start=start)
+            assert day11.part2(graph, start=start, engine=engine) == day11.part2(graph, start=start)
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        day11.part1({"you": ["out"]}, engine="bfs")
+
+
+def test_compiled_graph_matches_dict():
+    graph = day11.parse_input(["svr: a b", "a: dac", "b: dac fft", "dac: fft out", "fft: out"])
+    compact = day11.compile_graph(graph)
+    assert compact.names == ["svr", "a", "b", "dac", "fft", "out"]
+    assert list(compact.offsets) == [0, 2, 3, 5, 7, 8, 8]
+    assert [compact.names[i] for i in compact.successors(compact.index["b"])] == ["dac", "fft"]
+    for engine in day11.ENGINES:
+        assert day11.part1(compact, start="svr", engine=engine) == day11.part1(graph, start="svr")
+        assert day11.part2(compact, engine=engine) == day11.part2(graph) == 2
+    assert day11.part2(compact, required=("dac", "nowhere")) == 0
+
+
+@pytest.mark.parametrize("engine", ["segments", "dag", "dfs"])
+def test_deep_chain_has_no_recursion_limit(engine):
+    depth = 50_000
+    lines = ["svr: n0 dac"] + [f"n{i}: n{i + 1}" for i in range(depth)]
+    lines += [f"n{depth}: fft out", "dac: n0", "fft: out"]
+    graph = day11.compile_graph(day11.parse_input(lines))
+    assert day11.part1(graph, start="svr", engine=engine) == 4
+    assert day11.part2(graph, engine=engine) == 1
+
+    looped = day11.parse_input(lines + ["fft: out n0"])
+    with pytest.raises(ValueError):
+        day11.part1(looped, start="svr", engine=engine)
+
+
+def test_path_counter_matches_part_functions():
+    rng = random.Random(41)
+    for _ in range(20):
+        graph = _random_dag(rng, rng.randint(6, 14))
+        counter = day11.PathCounter(graph)
+        names = list(counter.graph.names)
+        for _ in range(10):
+            start, end = rng.choice(names), rng.choice(names)
+            required = tuple(rng.sample(names, rng.randint(0, 3)))
+            expected = day11.part2(graph, start=start, end=end, required=required)
+            assert counter.count(start, end, required) == expected
+    assert counter.count("svr", "out", ("missing",)) == 0
+
+
+def test_path_counter_reuses_target_vectors():
+    counter = day11.PathCounter(
+        day11.parse_input(["svr: a b", "a: dac", "b: dac fft", "dac: fft out", "fft: out"])
+    )
+    assert counter.count("svr", "out", ("dac", "fft")) == 2
+    assert counter.count("svr", "out", ("fft", "dac")) == 2
+    assert counter.count("svr", "out") == 5
+    assert counter.count("fft", "dac") == 0
+    assert len(counter._paths_to) == 3  # out, dac and fft
+
+
+def test_path_counter_rejects_any_cycle():
+    with pytest.raises(ValueError):
+        day11.PathCounter(day11.parse_input(["you: out", "a: b", "b: a"]))
+
+
+def test_segments_handle_many_required_nodes():
+    # Between consecutive gates there are two parallel devices, so every gate
+    # doubles the number of paths.
+    gates = [f"g{i}" for i in range(25)]
+    lines = ["svr: g0"]
+    for i, gate in enumerate(gates[:-1]):
+        lines += [f"{gate}: a{i} b{i}", f"a{i}: {gates[i + 1]}", f"b{i}: {gates[i + 1]} x{i}"]
+        lines += [f"x{i}: out"]
+    lines.append(f"{gates[-1]}: out")
+    graph = day11.parse_input(lines)
+    assert day11.part2(graph, required=tuple(reversed(gates))) == 2**24
+    assert day11.part2(graph, required=("g3", "x1")) == 0
+    assert day11.part2(graph, required=("x0", "g1")) == 0
+    assert day11.part2(graph, required=("x1", "g1")) == 2
+    assert day11.part2(graph, required=("g1", "x2")) == 4
@@ -2,6 +2,7 @@ import sys
 from importlib import util
 from pathlib import Path
 
+import pytest
 from utils.io import read_input_lines
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
@@ -51,3 +52,235 @@ def test_area_pruning_rejects_obvious_overflow():
         ]
     )
     assert day12.part1(parsed) == 0
+
+
+def test_catalog_shares_shapes_and_placements():
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    masks = catalog.placements(4, 12, 5)
+    assert catalog.placements(4, 12, 5) is masks
+    assert catalog.orientations(4) is catalog.orientations(4)
+
+    expected = set()
+    for ori in catalog.orientations(4):
+        for y0 in range(5 - ori.height + 1):
+            for x0 in range(12 - ori.width + 1):
+                expected.add(sum(1 << ((y0 + dy) * 12 + x0 + dx) for dx, dy in ori.cells))
+    assert len(masks) == len(expected) and set(masks) == expected
+
+    first, second = parsed.regions[:2]
+    assert day12.can_fit_region(parsed.shapes, first, catalog)
+    assert day12.can_fit_region(parsed.shapes, second, catalog)
+
+
+def test_dlx_matches_bitmask_search():
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    cases = [
+        (4, 4, [0, 0, 0, 0, 2, 0]),
+        (6, 3, [1, 0, 0, 0, 1, 0]),
+        (5, 5, [0, 1, 1, 0, 0, 0]),
+        (3, 6, [0, 0, 0, 1, 0, 1]),
+        (6, 6, [1, 1, 0, 0, 1, 1]),
+    ]
+    for w, h, counts in cases:
+        expected = day12._can_fit_exact(catalog, w, h, counts)
+        assert day12._can_fit_dlx(catalog, w, h, counts) is expected
+
+
+def test_regions_above_bitmask_cutoff_are_solved_exactly():
+    block = ["#" * 12] * 10
+    lines = ["0:", *block, "", "1:", "#" * 12, "", "2:", "###", "###", "###", ""]
+    # 23x10 has room by area, but next to the 12x10 block the bar fits nowhere.
+    lines += ["23x10: 1 1 0", "24x10: 1 1 0", "15x15: 0 0 25"]
+    parsed = day12.parse_input(lines)
+    assert [day12.can_fit_region(parsed.shapes, r) for r in parsed.regions] == [
+        False,
+        True,
+        True,
+    ]
+
+
+def test_checkerboard_parity_rejects_t_pieces():
+    # Each T covers three cells of one colour and one of the other, so five of
+    # them can never balance the 10/10 split of a 4x5 region.
+    parsed = day12.parse_input(["0:", "###", ".#.", "", "4x5: 5", "4x4: 4"])
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    assert not day12._parity_allows(catalog, 4, 5, [5])
+    assert day12._parity_allows(catalog, 4, 4, [4])
+    assert day12.part1(parsed) == 1
+
+
+def test_shelf_packing_proves_large_fits_without_search(monkeypatch):
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    region = (40, 40, [30, 30, 30, 30, 30, 19])  # 169 boxes of 3x3: 13 rows of 13
+
+    def no_search(*args, **kwargs):
+        raise AssertionError("exact search should not run")
+
+    monkeypatch.setattr(day12, "_can_fit_dlx", no_search)
+    assert day12.can_fit_region(parsed.shapes, region) is True
+
+
+def test_undecided_region_counts_as_fitting_by_area(monkeypatch):
+    block = ["#" * 12] * 10
+    parsed = day12.parse_input(["0:", *block, "", "1:", "#" * 12, "", "23x10: 1 1"])
+    monkeypatch.setattr(day12, "_SEARCH_BUDGET", 0)
+    with pytest.raises(day12.RegionUndecided, match="Could not decide"):
+        day12.can_fit_region(parsed.shapes, parsed.regions[0])
+    assert day12.evaluate_regions(parsed) == [None]
+    with pytest.raises(day12.RegionUndecided, match=r"regions \[0\]"):
+        day12.part1(parsed)
+    assert day12.part1(parsed, count_undecided=True) == 1
+
+
+def test_large_regions_get_a_bounded_search():
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    # 182 presents in a 40x40 region: too many for shelves of bounding boxes.
+    region = (40, 40, [28, 21, 31, 32, 40, 30])
+    assert not day12._shelf_pack(catalog, *region)
+    assert day12.can_fit_region(parsed.shapes, region, catalog) is True
+
+    huge = (60, 60, [70, 70, 70, 70, 70, 70])  # 420 boxes of 3x3 in room for 400
+    assert not day12._shelf_pack(catalog, *huge)
+    with pytest.raises(day12.RegionUndecided, match="Could not decide"):
+        day12.can_fit_region(parsed.shapes, huge, catalog)
+    assert day12.part1(day12.ParsedInput(parsed.shapes, [huge]), count_undecided=True) == 1
+
+
+def test_transposition_table_keeps_deeper_entries():
+    table = day12._TranspositionTable.for_budget(100, 40)  # rounds down to 2 slots
+    assert len(table.keys) == 2
+    table.add("deep", 5, slot=0)
+    table.add("shallow", 1, slot=0)
+    assert table.keys[0] == "deep"
+    table.add("deeper", 5, slot=0)
+    assert table.keys[0] == "deeper"
+
+
+def test_bitmask_search_with_tiny_table(monkeypatch):
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    cases = [(4, 4, [0, 0, 0, 0, 2, 0]), (5, 5, [0, 1, 1, 0, 0, 0]), (6, 6, [1, 1, 0, 0, 1, 1])]
+    expected = [day12._can_fit_exact(catalog, *case) for case in cases]
+    monkeypatch.setattr(day12, "_TABLE_BYTES", 1)
+    assert [day12._can_fit_exact(catalog, *case) for case in cases] == expected
+
+
+def test_stranded_pockets_next_to_placed_piece():
+    # 4x3 region; the piece at (1,0), (1,1), (0,1) seals the corner (0,0).
+    space = day12._FreeSpace(4, 3)
+    placed = (1 << 1) | (1 << 5) | (1 << 4)
+    assert space.stranded_near(placed, placed, 2) == 1
+    # A pocket of one cell is still usable by a one-cell present.
+    assert space.stranded_near(placed, placed, 1) == 0
+    # The open side is far bigger than any present.
+    assert space.stranded_near(placed, placed, 3) == 1
+
+
+def test_parallel_evaluation_matches_serial():
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    small = day12.ParsedInput(parsed.shapes, parsed.regions[:2] + [(4, 4, [0, 0, 0, 0, 2, 0])])
+    serial = day12.evaluate_regions(small)
+    assert day12.evaluate_regions(small, workers=2) == serial
+    assert day12.part1(small, workers=2) == sum(serial)
+
+
+class _TickingClock:
+    """Stand-in for ``time`` whose clock advances one second per reading."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        self.now += 1.0
+        return self.now
+
+
+def test_region_over_time_budget_is_undecided(monkeypatch):
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    # The first deadline check after 1024 nodes always finds the time spent.
+    monkeypatch.setattr(day12, "time", _TickingClock())
+    assert day12.evaluate_regions(parsed, timeout=0.5) == [True, True, None]
+    # The undecided region passed the area check, so part 1 may count it.
+    assert day12.part1(parsed, timeout=0.5, count_undecided=True) == 3
+
+
+def test_input_errors_are_not_undecided():
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    missing = day12.ParsedInput({0: parsed.shapes[0]}, [(4, 4, [0, 1])])
+    with pytest.raises(ValueError, match="Missing shape 1"):
+        day12.evaluate_regions(missing)
+
+
+def test_region_symmetry_keeps_one_placement_per_orbit():
+    assert len(day12._region_symmetries(4, 3)) == 3
+    assert len(day12._region_symmetries(3, 3)) == 7
+
+    catalog = day12.ShapeCatalog(day12.parse_input(["0:", "#", "", "3x3: 1"]).shapes)
+    masks = catalog.placements(0, 3, 3)
+    # One cell in a 3x3 square: a corner, an edge middle and the centre.
+    assert [masks[i] for i in catalog.first_placements(0, 3, 3)] == [1 << 0, 1 << 1, 1 << 4]
+    # In a 3x2 rectangle the corners and the edge middles form two orbits.
+    assert len(catalog.first_placements(0, 3, 2)) == 2
+
+
+def test_identical_copies_are_not_permuted():
+    parsed = day12.parse_input(["0:", "#", "", "1:", "##", "##", "", "3x3: 9 0"])
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    assert day12._can_fit_exact(catalog, 3, 3, [9, 0]) is True
+    # Copies share one shape column, so nine cells take one node per copy
+    # instead of one per ordering of the copies.
+    assert day12._can_fit_dlx(catalog, 3, 3, [9, 0], budget=9) is True
+    # Once one square is down, the other has no placement left.
+    assert day12._can_fit_dlx(catalog, 3, 3, [0, 2], budget=1) is False
+
+
+def test_dlx_decides_regions_beyond_the_bitmask_search(monkeypatch):
+    parsed = day12.parse_input(read_input_lines(2025, 12, variant="sample"))
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    # 24 presents in 224 cells, and shelves of bounding boxes do not fit.
+    region = (16, 14, [5, 4, 2, 2, 8, 3])
+    assert not day12._shelf_pack(catalog, *region)
+    # 13 presents in 112 cells, which the bitmask search once took and did not
+    # settle within five seconds.
+    small = (14, 8, [1, 4, 2, 3, 3, 0])
+    assert not day12._shelf_pack(catalog, *small)
+
+    def no_bitmask(*args, **kwargs):
+        raise AssertionError("bitmask search should not run")
+
+    monkeypatch.setattr(day12, "_can_fit_exact", no_bitmask)
+    assert day12.can_fit_region(parsed.shapes, region, catalog) is True
+    assert day12.can_fit_region(parsed.shapes, small, catalog) is True
+    # The sample's impossible region is refuted by dancing links alone.
+    assert day12._can_fit_dlx(catalog, *parsed.regions[2], budget=day12._SEARCH_BUDGET) is False
+
+
+def test_bitmask_budget_falls_back_to_dancing_links():
+    # The bitmask search ran for minutes on this region; dancing links packs
+    # it in a fraction of a second.
+    shapes = ["0:", "...", ".#.", "...", "", "1:", "..", ".#", "", "2:", "##.", "###", "##."]
+    parsed = day12.parse_input([*shapes, "", "4x9: 4 4 4"])
+    catalog = day12.ShapeCatalog(parsed.shapes)
+    region = parsed.regions[0]
+    assert not day12._shelf_pack(catalog, *region)
+    assert day12._can_fit_exact(catalog, *region, budget=day12._BITMASK_BUDGET) is None
+    assert day12.can_fit_region(parsed.shapes, region, catalog) is True
+
+
+def test_default_entry_points_bound_each_region(monkeypatch, capsys):
+    sample = read_input_lines(2025, 12, variant="sample")
+    timeouts = []
+
+    def fake_evaluate(parsed, workers=1, timeout=None):
+        timeouts.append(timeout)
+        return [True, None, False]
+
+    monkeypatch.setattr(day12, "evaluate_regions", fake_evaluate)
+    monkeypatch.setattr(day12, "read_input_lines", lambda year, day, variant=None: sample)
+    day12.run()
+    assert day12.part1(day12.parse_input(sample), count_undecided=True) == 2
+    assert timeouts == [day12._REGION_TIMEOUT] * 2
+    assert "upper bound): 1" in capsys.readouterr().out
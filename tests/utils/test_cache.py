@@ -0,0 +1,39 @@
+import pytest
+from utils.cache import PersistentLRU
+
+
+def test_evicts_least_recently_used():
+    cache = PersistentLRU(maxsize=2)
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1  # refresh "a"
+    cache["c"] = 3
+    assert "b" not in cache
+    assert cache.get("a") == 1
+    assert cache.get("b", -1) == -1
+    assert len(cache) == 2
+
+
+def test_round_trip_keeps_recency(tmp_path):
+    path = tmp_path / "nested" / "cache.json"
+    cache = PersistentLRU(maxsize=3, path=path)
+    for key in "abc":
+        cache[key] = ord(key)
+    cache.get("a")
+    cache.save()
+
+    reloaded = PersistentLRU(maxsize=3, path=path)
+    reloaded["d"] = 0
+    assert "b" not in reloaded
+    assert reloaded["a"] == ord("a")
+
+
+def test_unreadable_file_starts_empty(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json", encoding="utf-8")
+    assert len(PersistentLRU(path=path)) == 0
+
+
+def test_save_requires_path():
+    with pytest.raises(ValueError):
+        PersistentLRU().save()
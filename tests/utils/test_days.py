@@ -0,0 +1,44 @@
+import pytest
+from utils.days import (
+    discover_days,
+    input_entry_points,
+    load_day,
+    part_entry_points,
+    prepare_input,
+    solve_part,
+)
+from utils.io import read_input_lines
+
+
+def test_discovers_every_day():
+    days = discover_days()
+    assert days == sorted(days)
+    assert {(2025, day) for day in range(1, 13)} <= set(days)
+
+
+def test_hooked_days_match_their_run():
+    day5 = load_day(2025, 5)
+    lines = read_input_lines(2025, 5, variant="sample")
+    ranges, ids = day5.parse_input(lines)
+    parsed = prepare_input(day5, lines)
+    assert solve_part(day5, 1, parsed) == day5.part1(ranges, ids)
+    assert solve_part(day5, 2, parsed) == day5.part2(ranges)
+
+    day6 = load_day(2025, 6)
+    lines = read_input_lines(2025, 6, variant="sample")
+    assert solve_part(day6, 2, prepare_input(day6, lines)) == day6.part2(lines)
+
+
+def test_entry_points_prefer_hooks():
+    day1, day5, day11 = load_day(2025, 1), load_day(2025, 5), load_day(2025, 11)
+    assert input_entry_points(day1) == ("parse_input",)
+    assert part_entry_points(day1, 2) == ("part2",)
+    assert input_entry_points(day11) == ("prepare",)
+    assert part_entry_points(day5, 1) == ("solve_part1",)
+
+
+def test_rejects_unknown_part():
+    day1 = load_day(2025, 1)
+    lines = read_input_lines(2025, 1, variant="sample")
+    with pytest.raises(ValueError):
+        solve_part(day1, 3, prepare_input(day1, lines))
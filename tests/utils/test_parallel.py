@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+
+import pytest
+from utils.parallel import process_map
+
+from utils import parallel
+
+
+def _square(x):
+    return x * x
+
+
+def _fail_on_three(x):
+    if x == 3:
+        raise RuntimeError("three")
+    return x
+
+
+def _pid(_):
+    return os.getpid()
+
+
+_OFFSET = 0
+
+
+def _set_offset(value):
+    global _OFFSET
+    _OFFSET = value
+
+
+def _add_offset(x):
+    return x + _OFFSET
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_results_keep_input_order(workers):
+    items = list(range(20))
+    result = process_map(_square, items, workers, chunksize=3, priority=lambda x: x % 7)
+    assert result == [x * x for x in items]
+
+
+def test_exceptions_propagate():
+    with pytest.raises(RuntimeError, match="three"):
+        process_map(_fail_on_three, range(10), workers=2)
+
+
+def test_work_runs_in_other_processes():
+    assert os.getpid() not in process_map(_pid, range(4), workers=2)
+
+
+def test_initializer_runs_in_every_worker():
+    result = process_map(_add_offset, [1, 2, 3], 2, initializer=_set_offset, initargs=(10,))
+    assert result == [11, 12, 13]
+
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        process_map(_square, [1], workers=0)
+    with pytest.raises(ValueError):
+        process_map(_square, [1], chunksize=0)
+
+
+@pytest.mark.parametrize(("platform", "method"), [("linux", "fork"), ("darwin", None)])
+def test_fork_only_on_linux(monkeypatch, platform, method):
+    monkeypatch.setattr(parallel.sys, "platform", platform)
+    expected = method or multiprocessing.get_context().get_start_method()
+    assert parallel._pool_context().get_start_method() == expected
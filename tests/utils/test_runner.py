@@ -0,0 +1,135 @@
+import sys
+
+import pytest
+from utils.runner import DaySession, _definitions, _fingerprint
+
+import utils
+
+DAY_SOURCE = """
+from dataclasses import dataclass
+
+YEAR = 2099
+DAY = 1
+SCALE = 2
+
+
+@dataclass(frozen=True)
+class Numbers:
+    values: list[int]
+
+
+def parse_input(lines):
+    return Numbers([int(line) for line in lines])
+
+
+def _scaled(value):
+    return SCALE * value
+
+
+def part1(numbers):
+    assert isinstance(numbers, Numbers)
+    return sum(numbers.values)
+
+
+def part2(numbers):
+    return sum(_scaled(value) for value in numbers.values)
+"""
+
+
+def test_fingerprint_follows_helpers_and_ignores_comments():
+    defs = _definitions(DAY_SOURCE)
+    part1, part2 = _fingerprint(defs, ["part1"]), _fingerprint(defs, ["part2"])
+
+    reformatted = _definitions(
+        DAY_SOURCE.replace("    return SCALE", "    # doubled\n    return SCALE")
+    )
+    assert _fingerprint(reformatted, ["part2"]) == part2
+
+    rescaled = _definitions(DAY_SOURCE.replace("SCALE = 2", "SCALE = 3"))
+    assert _fingerprint(rescaled, ["part1"]) == part1
+    assert _fingerprint(rescaled, ["part2"]) != part2
+
+
+@pytest.fixture
+def session(tmp_path):
+    path = tmp_path / "main.py"
+    path.write_text(DAY_SOURCE, encoding="utf-8")
+    input_path = tmp_path / "01.txt"
+    input_path.write_text("1\n2\n3\n", encoding="utf-8")
+    return DaySession(2099, 1, path=path, input_path=input_path)
+
+
+def test_code_edit_only_resolves_changed_parts(session):
+    assert set(session.refresh()) == {1, 2}
+    assert session.answers == {1: 6, 2: 12}
+    parsed = session.parsed
+    assert session.refresh() == {}
+
+    session.path.write_text(DAY_SOURCE.replace("SCALE = 2", "SCALE = 3"), encoding="utf-8")
+    assert set(session.refresh()) == {2}
+    assert session.answers == {1: 6, 2: 18}
+    assert session.parsed is parsed
+
+    # Part 1 runs again on the old parsed input; the unchanged class keeps
+    # its identity across the reload, so the isinstance check still holds.
+    session.path.write_text(
+        session.path.read_text().replace("sum(numbers.values)", "sum(numbers.values) + 1")
+    )
+    assert set(session.refresh()) == {1}
+    assert session.answers == {1: 7, 2: 18}
+
+
+def test_input_edit_reparses_and_resolves_both(session):
+    session.refresh()
+    parsed = session.parsed
+    session.input_path.write_text("10\n", encoding="utf-8")
+    assert set(session.refresh()) == {1, 2}
+    assert session.answers == {1: 10, 2: 20}
+    assert session.parsed is not parsed
+
+
+def test_failed_reload_keeps_previous_state(session):
+    session.refresh()
+    session.path.write_text(DAY_SOURCE + "\ndef broken(:\n", encoding="utf-8")
+    with pytest.raises(SyntaxError):
+        session.refresh()
+    assert session.answers == {1: 6, 2: 12}
+
+    session.path.write_text(DAY_SOURCE, encoding="utf-8")
+    assert session.refresh() == {}
+
+
+HELPER_DAY_SOURCE = """
+from utils.watch_helper import offset
+
+
+def parse_input(lines):
+    return [int(line) + offset() for line in lines]
+
+
+def part1(numbers):
+    return sum(numbers)
+
+
+def part2(numbers):
+    return max(numbers)
+"""
+
+
+def test_utils_edit_reloads_and_resolves(session, tmp_path, monkeypatch):
+    helper = tmp_path / "watch_helper.py"
+    helper.write_text("def offset():\n    return 0\n", encoding="utf-8")
+    monkeypatch.setattr(utils, "__path__", [*utils.__path__, str(tmp_path)])
+    monkeypatch.delitem(sys.modules, "utils.watch_helper", raising=False)
+    session.path.write_text(HELPER_DAY_SOURCE, encoding="utf-8")
+    try:
+        assert set(session.refresh()) == {1, 2}
+        assert session.answers == {1: 6, 2: 3}
+        assert helper in session.watched_paths()
+        assert session.refresh() == {}
+
+        helper.write_text("def offset():\n    return 10\n", encoding="utf-8")
+        assert set(session.refresh()) == {1, 2}
+        assert session.answers == {1: 36, 2: 13}
+    finally:
+        sys.modules.pop("utils.watch_helper", None)
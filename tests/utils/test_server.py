@@ -0,0 +1,87 @@
+import os
+import threading
+
+import pytest
+from utils.io import read_input
+
+from utils import server
+
+
+def test_answers_are_memoised_by_input_hash(tmp_path, monkeypatch):
+    path = tmp_path / "01.txt"
+    path.write_text(read_input(2025, 1, variant="sample"), encoding="utf-8")
+    monkeypatch.setattr(server, "get_input_path", lambda year, day, variant=None: path)
+    service = server.SolverService()
+
+    first = service.solve(2025, 1, 1)
+    assert first["answer"] == 3 and not first["cached"]
+    assert service.solve(2025, 1, 1)["cached"]
+
+    path.write_text("R50\n", encoding="utf-8")  # lands on 0 once
+    changed = service.solve(2025, 1, 1)
+    assert changed == {**changed, "answer": 1, "cached": False}
+
+
+DAY_SOURCE = """
+def parse_input(lines):
+    return [int(line) for line in lines]
+
+
+def part1(numbers):
+    return sum(numbers)
+
+
+def part2(numbers):
+    return max(numbers)
+"""
+
+
+@pytest.fixture
+def fake_day(tmp_path, monkeypatch):
+    path = tmp_path / "main.py"
+    path.write_text(DAY_SOURCE, encoding="utf-8")
+    input_path = tmp_path / "01.txt"
+    input_path.write_text("1\n2\n3\n", encoding="utf-8")
+    monkeypatch.setattr(server, "day_path", lambda year, day: path)
+    monkeypatch.setattr(server, "get_input_path", lambda year, day, variant=None: input_path)
+    return path
+
+
+def test_code_edit_invalidates_answers(fake_day):
+    service = server.SolverService()
+    assert service.solve(2099, 1, 1)["answer"] == 6
+    assert service.solve(2099, 1, 1)["cached"]
+
+    fake_day.write_text(DAY_SOURCE.replace("sum(numbers)", "sum(numbers) * 10"), encoding="utf-8")
+    stat = fake_day.stat()
+    os.utime(fake_day, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    changed = service.solve(2099, 1, 1)
+    assert changed == {**changed, "answer": 60, "cached": False}
+
+
+def test_preload_skips_days_that_fail_to_import(fake_day, monkeypatch):
+    broken = fake_day.with_name("broken.py")
+    broken.write_text("def part1(:\n", encoding="utf-8")
+    paths = {1: fake_day, 2: broken}
+    monkeypatch.setattr(server, "discover_days", lambda: [(2099, 1), (2099, 2)])
+    monkeypatch.setattr(server, "day_path", lambda year, day: paths[day])
+    assert server.SolverService().preload() == [(2099, 1)]
+
+
+def test_socket_round_trip(tmp_path):
+    socket_path = tmp_path / "solver.sock"
+    srv = server.SolverServer(socket_path, server.SolverService())
+    thread = threading.Thread(target=srv.serve_until_stopped)
+    thread.start()
+    try:
+        assert server.solve(2025, 7, 1, "sample", socket_path)["answer"] == 21
+        assert server.solve(2025, 7, 1, "sample", socket_path)["cached"]
+        assert server.request({"op": "ping"}, socket_path)["days"] == [[2025, 7]]
+        with pytest.raises(RuntimeError, match="Part must be 1 or 2"):
+            server.solve(2025, 7, 3, "sample", socket_path)
+        assert server.request({"op": "bogus"}, socket_path)["ok"] is False
+    finally:
+        server.request({"op": "stop"}, socket_path)
+        thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert not socket_path.exists()
@@ -0,0 +1,57 @@
+from array import array
+
+import numpy as np
+import pytest
+from utils.union_find import DisjointSet, top_sizes
+
+
+def test_union_tracks_components_and_histogram():
+    dsu = DisjointSet(6)
+    assert dsu.union(0, 1) is True
+    assert dsu.union(1, 0) is False
+    dsu.union(2, 3)
+    dsu.union(3, 1)
+
+    assert dsu.components == 3
+    assert dsu.size_histogram() == {4: 1, 1: 2}
+    assert dsu.largest_sizes(2) == [4, 1]
+    assert dsu.component_sizes() == [4, 1, 1]
+    assert dsu.component_size(2) == 4
+
+
+def test_union_many_accepts_lists_arrays_and_numpy():
+    dsu = DisjointSet(8)
+    assert dsu.union_many([0, 1], [1, 2]) == 2
+    assert dsu.union_many(array("i", [2, 4]), array("i", [0, 5])) == 1
+    assert dsu.union_many(np.array([5, 6]), np.array([6, 7])) == 2
+    assert dsu.largest_sizes(3) == [4, 3, 1]
+
+    with pytest.raises(ValueError):
+        dsu.union_many([0, 1], [2])
+
+
+def test_rollback_restores_earlier_state():
+    dsu = DisjointSet(5, rollback=True)
+    dsu.union(0, 1)
+    mark = dsu.snapshot()
+    dsu.union(1, 2)
+    dsu.union(3, 4)
+    dsu.union(4, 0)
+    assert dsu.components == 1
+
+    dsu.rollback(mark)
+    assert dsu.components == 4
+    assert dsu.size_histogram() == {2: 1, 1: 3}
+    assert dsu.connected(0, 1)
+    assert not dsu.connected(1, 2)
+    assert not dsu.connected(3, 4)
+
+
+def test_rollback_requires_opt_in():
+    with pytest.raises(ValueError):
+        DisjointSet(3).snapshot()
+
+
+def test_top_sizes_pads_nothing_and_respects_counts():
+    assert top_sizes({5: 2, 3: 4}, 3) == [5, 5, 3]
+    assert top_sizes({2: 1}, 3) == [2]
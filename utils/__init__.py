@@ -1,9 +1,14 @@
 """Shared utilities for Advent of Code solutions across years."""
 
-from .io import get_input_path, read_input, read_input_lines
+from .io import get_input_path, iter_input_lines, read_input, read_input_lines
+from .parallel import process_map
+from .union_find import DisjointSet
 
 __all__ = [
+    "DisjointSet",
     "get_input_path",
+    "iter_input_lines",
+    "process_map",
     "read_input",
     "read_input_lines",
 ]
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+_CACHE_ROOT = Path(__file__).resolve().parents[1] / ".cache"
+
+
+def cache_path(name: str) -> Path:
+    """Return the path of the JSON cache file called ``name`` under ``.cache/``."""
+
+    return _CACHE_ROOT / f"{name}.json"
+
+
+class PersistentLRU:
+    """Bounded least-recently-used mapping that can be saved to a JSON file.
+
+    Keys are strings and values must be JSON serialisable. When ``path`` is
+    given, existing entries are loaded from it (an unreadable file is treated
+    as empty) and ``save`` writes them back, most recently used last.
+    """
+
+    def __init__(self, maxsize: int = 4096, path: str | Path | None = None):
+        if maxsize < 1:
+            raise ValueError(f"maxsize must be positive, got {maxsize}")
+        self.maxsize = maxsize
+        self.path = Path(path) if path is not None else None
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        if self.path is not None and self.path.exists():
+            self._load(self.path)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._data
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._data[key]
+        self._data.move_to_end(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self[key] if key in self._data else default
+
+    def save(self) -> None:
+        """Write the entries to ``path``, replacing the file atomically."""
+
+        if self.path is None:
+            raise ValueError("This cache has no path to save to")
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        tmp.write_text(json.dumps(list(self._data.items())), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def _load(self, path: Path) -> None:
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if not isinstance(entries, list):
+            return
+        for entry in entries:
+            if isinstance(entry, list) and len(entry) == 2 and isinstance(entry[0], str):
+                self[entry[0]] = entry[1]
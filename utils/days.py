@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import sys
+from importlib import util
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+_ROOT = Path(__file__).resolve().parents[1]
+
+# A day module may define ``prepare(lines)`` to build what both parts take
+# (``parse_input(lines)`` otherwise) and ``solve_part1(prepared)`` /
+# ``solve_part2(prepared)`` when a part is not simply ``partN(prepared)``.
+_PREPARE_HOOK = "prepare"
+_SOLVE_HOOK = "solve_part{part}"
+
+
+def day_path(year: int, day: int) -> Path:
+    return _ROOT / str(year) / f"{day:02d}" / "main.py"
+
+
+def discover_days(root: Path = _ROOT) -> list[tuple[int, int]]:
+    """Return ``(year, day)`` for every ``YYYY/DD/main.py`` under ``root``, sorted."""
+
+    days = []
+    for path in root.glob("[0-9][0-9][0-9][0-9]/[0-9][0-9]/main.py"):
+        days.append((int(path.parent.parent.name), int(path.parent.name)))
+    return sorted(days)
+
+
+def load_day(year: int, day: int, path: Path | None = None) -> ModuleType:
+    """Execute a day's ``main.py`` as module ``aoc<year>_day<DD>`` and return it.
+
+    Every call loads the file afresh, replacing the entry in ``sys.modules``
+    so that process pools pickle its functions by reference. ``path``
+    overrides the file's usual location.
+    """
+
+    if path is None:
+        path = day_path(year, day)
+    name = f"aoc{year}_day{day:02d}"
+    spec = util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Could not load module from {path}")
+    module = util.module_from_spec(spec)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[name]
+        raise
+    return module
+
+
+def dependencies(module: ModuleType) -> list[ModuleType]:
+    """First-party ``utils`` modules that ``module`` uses, directly or indirectly.
+
+    A module counts as used when one of the module's globals is that module
+    or was defined in it. Dependencies come before the modules that use them.
+    """
+
+    seen: set[str] = set()
+    order: list[ModuleType] = []
+
+    def visit(mod: ModuleType) -> None:
+        for value in list(vars(mod).values()):
+            name = value.__name__ if isinstance(value, ModuleType) else None
+            if name is None:
+                name = getattr(value, "__module__", None)
+            if not isinstance(name, str) or name in seen:
+                continue
+            if name != "utils" and not name.startswith("utils."):
+                continue
+            dep = sys.modules.get(name)
+            if dep is None or getattr(dep, "__file__", None) is None:
+                continue
+            seen.add(name)
+            visit(dep)
+            order.append(dep)
+
+    visit(module)
+    return order
+
+
+def source_files(module: ModuleType) -> list[Path]:
+    """The day's file followed by the files of its first-party dependencies."""
+
+    return [Path(module.__file__)] + [Path(dep.__file__) for dep in dependencies(module)]
+
+
+def prepare_input(module: ModuleType, lines: list[str]) -> Any:
+    """Turn ``lines`` into the value a day's parts are called with."""
+
+    prepare = getattr(module, _PREPARE_HOOK, module.parse_input)
+    return prepare(lines)
+
+
+def solve_part(module: ModuleType, part: int, prepared: Any) -> Any:
+    """Answer ``part`` (1 or 2) from ``prepared``, as the day's ``run`` would."""
+
+    if part not in (1, 2):
+        raise ValueError(f"Part must be 1 or 2, got {part}")
+    return getattr(module, part_entry_points(module, part)[0])(prepared)
+
+
+def input_entry_points(module: ModuleType) -> tuple[str, ...]:
+    """Names of the module functions ``prepare_input`` calls."""
+
+    return (_PREPARE_HOOK,) if hasattr(module, _PREPARE_HOOK) else ("parse_input",)
+
+
+def part_entry_points(module: ModuleType, part: int) -> tuple[str, ...]:
+    """Names of the module functions ``solve_part`` calls for ``part``."""
+
+    hook = _SOLVE_HOOK.format(part=part)
+    return (hook,) if hasattr(module, hook) else (f"part{part}",)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 from pathlib import Path
+from typing import Iterator
 
 _ROOT = Path(__file__).resolve().parents[1]
 _INPUT_ROOT = _ROOT / "inputs"
@@ -60,3 +61,28 @@ def read_input_lines(year: int | str, day: int | str, variant: str | None = None
 
     content = read_input(year, day, variant)
     return [line.rstrip("\n") for line in content.splitlines()]
+
+
+def iter_input_lines(year: int | str, day: int | str, variant: str | None = None) -> Iterator[str]:
+    """Yield the input file line by line without reading it into memory.
+
+    Trailing blank lines are dropped so the result matches ``read_input_lines``.
+    """
+
+    path = get_input_path(year, day, variant)
+    if not path.exists():
+        raise FileNotFoundError(
+            f"Input for {year} day {day} not found at {path}. Create it or adjust the path."
+        )
+
+    blank_run = 0
+    with path.open(encoding="utf-8") as handle:
+        for raw in handle:
+            line = raw.rstrip("\n")
+            if not line:
+                blank_run += 1
+                continue
+            for _ in range(blank_run):
+                yield ""
+            blank_run = 0
+            yield line
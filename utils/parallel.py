@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+from concurrent.futures import FIRST_EXCEPTION, ProcessPoolExecutor, wait
+from typing import Any, Callable, Iterable, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _pool_context() -> Any:
+    # Forked workers inherit modules loaded from a file path (as the tests and
+    # day scripts do), so functions from those modules pickle by reference.
+    # Fork is only safe to rely on under Linux; macOS defaults to spawn since
+    # system frameworks may not survive a fork, so other platforms keep their
+    # default and need the mapped function to be importable by the workers.
+    if sys.platform.startswith("linux"):
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+
+def _run_chunk(func: Callable[[T], R], chunk: Sequence[tuple[int, T]]) -> list[tuple[int, R]]:
+    return [(i, func(item)) for i, item in chunk]
+
+
+def process_map(
+    func: Callable[[T], R],
+    items: Iterable[T],
+    workers: int | None = None,
+    chunksize: int = 1,
+    priority: Callable[[T], Any] | None = None,
+    initializer: Callable[..., None] | None = None,
+    initargs: tuple = (),
+) -> list[R]:
+    """Apply ``func`` to every item in a process pool; return results in input order.
+
+    Items are dispatched in chunks of ``chunksize``, highest ``priority(item)``
+    first, so long jobs start early instead of trailing at the end. The output
+    does not depend on scheduling. ``workers`` defaults to the CPU count; with
+    one worker (or a single item) everything runs in this process. The first
+    exception raised by ``func`` cancels the pending chunks and is re-raised.
+    """
+
+    items = list(items)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be positive, got {workers}")
+    if chunksize < 1:
+        raise ValueError(f"chunksize must be positive, got {chunksize}")
+
+    order = list(range(len(items)))
+    if priority is not None:
+        order.sort(key=lambda i: priority(items[i]), reverse=True)
+
+    results: list[Any] = [None] * len(items)
+    if workers == 1 or len(items) <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        for i in order:
+            results[i] = func(items[i])
+        return results
+
+    chunks = [
+        [(i, items[i]) for i in order[start : start + chunksize]]
+        for start in range(0, len(order), chunksize)
+    ]
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(chunks)),
+        mp_context=_pool_context(),
+        initializer=initializer,
+        initargs=initargs,
+    ) as pool:
+        futures = [pool.submit(_run_chunk, func, chunk) for chunk in chunks]
+        done, _ = wait(futures, return_when=FIRST_EXCEPTION)
+        for future in futures:
+            if future in done and future.exception() is not None:
+                pool.shutdown(cancel_futures=True)
+                raise future.exception()  # type: ignore[misc]
+        for future in futures:
+            for i, result in future.result():
+                results[i] = result
+    return results
@@ -0,0 +1,237 @@
+"""Run both parts of a day, optionally re-solving whenever its code or input changes.
+
+``uv run python -m utils.runner 2025 7 --variant sample --watch`` polls the
+day's ``main.py``, the ``utils`` modules it imports and its input file. After
+an edit only the affected work is redone: the input is parsed again only when
+it, the parsing code or a ``utils`` module changed, and a part is solved
+again only when its code changed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import importlib
+import time
+import traceback
+from collections.abc import Iterable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from utils.days import (
+    day_path,
+    dependencies,
+    input_entry_points,
+    load_day,
+    part_entry_points,
+    prepare_input,
+    solve_part,
+)
+from utils.io import get_input_path
+
+
+def _definitions(source: str) -> dict[str, ast.AST]:
+    """Map each name bound at the top level of ``source`` to its statement."""
+
+    defs: dict[str, ast.AST] = {}
+    for node in ast.parse(source).body:
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            defs[node.name] = node
+        elif isinstance(node, (ast.Assign, ast.AnnAssign)):
+            targets = node.targets if isinstance(node, ast.Assign) else [node.target]
+            for target in targets:
+                for name in ast.walk(target):
+                    if isinstance(name, ast.Name):
+                        defs[name.id] = node
+    return defs
+
+
+def _fingerprint(defs: dict[str, ast.AST], names: Iterable[str]) -> str:
+    """Hash the definitions of ``names`` and of every top-level name they use.
+
+    Definitions are compared as syntax trees, so comments, formatting and
+    line numbers do not matter. Imported names are not followed; see
+    ``_library_hash`` for the ``utils`` modules a day imports.
+    """
+
+    digest = hashlib.sha1()
+    seen: set[str] = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in seen or name not in defs:
+            continue
+        seen.add(name)
+        node = defs[name]
+        digest.update(f"{name}\0{ast.dump(node)}\0".encode())
+        stack.extend(n.id for n in ast.walk(node) if isinstance(n, ast.Name))
+    return digest.hexdigest()
+
+
+def _carry_over_classes(
+    old: ModuleType, new: ModuleType, old_defs: dict[str, ast.AST], new_defs: dict[str, ast.AST]
+) -> None:
+    # A reused parsed input holds instances of the old module's classes, so
+    # classes whose code did not change keep their identity for isinstance.
+    for name, node in new_defs.items():
+        if not isinstance(node, ast.ClassDef) or not isinstance(old_defs.get(name), ast.ClassDef):
+            continue
+        if _fingerprint(old_defs, [name]) == _fingerprint(new_defs, [name]) and hasattr(old, name):
+            setattr(new, name, getattr(old, name))
+
+
+def _library_sources(module: ModuleType | None) -> dict[Path, bytes]:
+    if module is None:
+        return {}
+    paths = [Path(dep.__file__) for dep in dependencies(module)]
+    return {path: path.read_bytes() for path in paths}
+
+
+def _library_hash(sources: dict[Path, bytes]) -> str:
+    """Hash the ``utils`` sources a day imports, which ``_fingerprint`` does not follow."""
+
+    digest = hashlib.sha1()
+    for path, data in sorted(sources.items()):
+        digest.update(f"{path.name}\0".encode() + data + b"\0")
+    return digest.hexdigest()
+
+
+class DaySession:
+    """A day's module, parsed input and answers, kept up to date by ``refresh``."""
+
+    def __init__(
+        self,
+        year: int,
+        day: int,
+        variant: str | None = None,
+        path: Path | None = None,
+        input_path: Path | None = None,
+    ):
+        self.year, self.day, self.variant = year, day, variant
+        self.path = path if path is not None else day_path(year, day)
+        self.input_path = (
+            input_path if input_path is not None else get_input_path(year, day, variant)
+        )
+        self.module: ModuleType | None = None
+        self.answers: dict[int, Any] = {}
+        self.lines: list[str] = []
+        self.parsed: Any = None
+        self._defs: dict[str, ast.AST] = {}
+        self._source: str | None = None
+        self._input: bytes | None = None
+        self._libraries: dict[Path, bytes] = {}
+        self._fingerprints: dict[str, str] = {}
+
+    def watched_paths(self) -> list[Path]:
+        return [self.path, self.input_path, *self._libraries]
+
+    def refresh(self) -> dict[int, float]:
+        """Redo whatever the current files invalidate.
+
+        Returns the seconds spent on each part that was solved again. If
+        loading, parsing or solving raises, the session keeps its previous
+        state.
+        """
+
+        source = self.path.read_text(encoding="utf-8")
+        data = self.input_path.read_bytes()
+        libraries = _library_sources(self.module)
+        if source == self._source and data == self._input and libraries == self._libraries:
+            return {}
+
+        module, defs = self.module, self._defs
+        libraries_changed = libraries != self._libraries
+        if module is not None and libraries_changed:
+            # Reload every utils module the day uses, dependencies first, so
+            # none of them keeps names bound from an outdated one.
+            for dep in dependencies(module):
+                importlib.reload(dep)
+        if module is None or source != self._source or libraries_changed:
+            defs = _definitions(source)
+            module = load_day(self.year, self.day, self.path)
+            if self.module is not None and not libraries_changed:
+                _carry_over_classes(self.module, module, self._defs, defs)
+            libraries = _library_sources(module)
+
+        fingerprints = {
+            "input": _fingerprint(defs, input_entry_points(module)),
+            "libraries": _library_hash(libraries),
+        }
+        for part in (1, 2):
+            fingerprints[f"part{part}"] = _fingerprint(defs, part_entry_points(module, part))
+
+        lines, parsed = self.lines, self.parsed
+        reparse = data != self._input or any(
+            fingerprints[key] != self._fingerprints.get(key) for key in ("input", "libraries")
+        )
+        if reparse:
+            lines = data.decode("utf-8").rstrip("\n").splitlines()
+            parsed = prepare_input(module, lines)
+
+        answers = dict(self.answers)
+        timings: dict[int, float] = {}
+        for part in (1, 2):
+            key = f"part{part}"
+            if reparse or fingerprints[key] != self._fingerprints.get(key):
+                started = time.perf_counter()
+                answers[part] = solve_part(module, part, parsed)
+                timings[part] = time.perf_counter() - started
+
+        self.module, self._defs, self._source, self._input = module, defs, source, data
+        self._libraries = libraries
+        self.lines, self.parsed, self.answers = lines, parsed, answers
+        self._fingerprints = fingerprints
+        return timings
+
+    def report(self, timings: dict[int, float]) -> None:
+        for part in (1, 2):
+            seconds = timings.get(part)
+            note = "unchanged" if seconds is None else f"{seconds * 1000:.1f} ms"
+            print(f"Part {part}: {self.answers[part]}  ({note})", flush=True)
+
+
+def _stamps(paths: list[Path]) -> list[int | None]:
+    return [path.stat().st_mtime_ns if path.exists() else None for path in paths]
+
+
+def watch(session: DaySession, interval: float = 0.2) -> None:
+    """Solve, then poll the watched files and re-solve after every change."""
+
+    stamps: list[int | None] | None = None
+    while True:
+        current = _stamps(session.watched_paths())
+        if current != stamps:
+            stamps = current
+            try:
+                timings = session.refresh()
+            except Exception:  # noqa: BLE001 - keep watching while the code is mid-edit
+                traceback.print_exc()
+            else:
+                if timings:
+                    session.report(timings)
+        time.sleep(interval)
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("year", type=int)
+    parser.add_argument("day", type=int)
+    parser.add_argument("--variant", help="input variant, e.g. sample")
+    parser.add_argument("--watch", action="store_true", help="re-solve when files change")
+    parser.add_argument("--interval", type=float, default=0.2, help="polling interval (s)")
+    args = parser.parse_args(argv)
+
+    session = DaySession(args.year, args.day, args.variant)
+    if not args.watch:
+        session.report(session.refresh())
+        return
+    try:
+        watch(session, args.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""Long-running solver that keeps day modules and parsed inputs warm.
+
+Start it with ``uv run python -m utils.server serve`` and query it with
+``uv run python -m utils.server solve 2025 7 1 --variant sample``. Requests
+and responses are JSON objects, one per line, over a Unix domain socket.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import importlib
+import json
+import socket
+import socketserver
+import sys
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from types import ModuleType
+from typing import Any
+
+from utils.cache import PersistentLRU
+from utils.days import (
+    day_path,
+    dependencies,
+    discover_days,
+    load_day,
+    prepare_input,
+    solve_part,
+    source_files,
+)
+from utils.io import get_input_path
+
+DEFAULT_SOCKET = Path(__file__).resolve().parents[1] / ".cache" / "solver.sock"
+
+
+class SolverService:
+    """Answers ``(year, day, part, variant)`` queries from preloaded modules.
+
+    Parsed inputs live in an LRU keyed by the SHA-1 of the input file, so an
+    edited file is parsed again while an unchanged one never is. Answers are
+    memoised under the same hash. Both keys also hold the SHA-1 of the day's
+    source and of the ``utils`` modules it uses: before each query their
+    modification times are checked, and on a change those ``utils`` modules
+    are reloaded and the day is loaded again, so no answer from older code
+    is served.
+    """
+
+    def __init__(self, max_inputs: int = 32, max_answers: int = 1024):
+        self.modules: dict[tuple[int, int], ModuleType] = {}
+        self._sources: dict[tuple[int, int], tuple[dict[Path, int], str]] = {}
+        self._inputs = PersistentLRU(max_inputs)
+        self._answers = PersistentLRU(max_answers)
+
+    def preload(self) -> list[tuple[int, int]]:
+        """Import every discovered day; return the days that loaded.
+
+        A day whose file cannot be imported (``ImportError`` or
+        ``SyntaxError``) is reported on stderr and skipped.
+        """
+
+        for year, day in discover_days():
+            try:
+                self.module(year, day)
+            except (ImportError, SyntaxError) as exc:
+                print(f"Skipping {year} day {day}: {type(exc).__name__}: {exc}", file=sys.stderr)
+        return sorted(self.modules)
+
+    def module(self, year: int, day: int) -> ModuleType:
+        """Return the day's module, loading it again if its sources changed."""
+
+        key = (year, day)
+        module = self.modules.get(key)
+        if module is not None:
+            stamps, _ = self._sources[key]
+            if stamps == _stamps(stamps):
+                return module
+            for dep in dependencies(module):
+                importlib.reload(dep)
+        module = load_day(year, day, day_path(year, day))
+        files = source_files(module)
+        digest = hashlib.sha1()
+        for path in files:
+            digest.update(path.read_bytes())
+        self.modules[key] = module
+        self._sources[key] = (_stamps(files), digest.hexdigest())
+        return module
+
+    def solve(self, year: int, day: int, part: int, variant: str | None = None) -> dict[str, Any]:
+        """Return ``{"answer", "cached", "seconds"}`` for one part of one day."""
+
+        started = time.perf_counter()
+        module = self.module(year, day)
+        _, source = self._sources[(year, day)]
+        path = get_input_path(year, day, variant)
+        if not path.exists():
+            raise FileNotFoundError(f"Input for {year} day {day} not found at {path}")
+        data = path.read_bytes()
+        digest = hashlib.sha1(data).hexdigest()
+
+        answer_key = f"{year}/{day}/{part}/{source}/{digest}"
+        cached = answer_key in self._answers
+        if cached:
+            answer = self._answers[answer_key]
+        else:
+            input_key = f"{year}/{day}/{source}/{digest}"
+            if input_key not in self._inputs:
+                lines = data.decode("utf-8").rstrip("\n").splitlines()
+                self._inputs[input_key] = prepare_input(module, lines)
+            answer = solve_part(module, part, self._inputs[input_key])
+            if not isinstance(answer, (int, str)):
+                answer = str(answer)
+            self._answers[answer_key] = answer
+        return {"answer": answer, "cached": cached, "seconds": time.perf_counter() - started}
+
+
+def _stamps(paths: Iterable[Path]) -> dict[Path, int]:
+    stamps = {}
+    for path in paths:
+        try:
+            stamps[path] = path.stat().st_mtime_ns
+        except OSError:
+            stamps[path] = -1
+    return stamps
+
+
+# Failures caused by a request or by the code it runs; the client gets the
+# error and the server keeps serving. Anything else is reported to the client
+# and then re-raised for ``socketserver`` to log.
+_REQUEST_ERRORS = (ArithmeticError, ImportError, LookupError, OSError, SyntaxError, ValueError)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    server: SolverServer
+
+    def handle(self) -> None:
+        for raw in self.rfile:
+            try:
+                response = self.server.dispatch(json.loads(raw))
+            except (*_REQUEST_ERRORS, TypeError, RuntimeError) as exc:
+                response = _error(exc)
+            except Exception as exc:
+                self._reply(_error(exc))
+                raise
+            self._reply(response)
+            if self.server.stopping:
+                return
+
+    def _reply(self, response: dict[str, Any]) -> None:
+        self.wfile.write(json.dumps(response).encode() + b"\n")
+        self.wfile.flush()
+
+
+def _error(exc: BaseException) -> dict[str, Any]:
+    return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+
+
+class SolverServer(socketserver.UnixStreamServer):
+    """Serves one connection at a time, since the service is not thread-safe."""
+
+    def __init__(self, path: str | Path, service: SolverService):
+        self.service = service
+        self.stopping = False
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.unlink(missing_ok=True)
+        super().__init__(str(path), _Handler)
+
+    def dispatch(self, request: dict[str, Any]) -> dict[str, Any]:
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "days": [list(key) for key in sorted(self.service.modules)]}
+        if op == "stop":
+            self.stopping = True
+            return {"ok": True}
+        if op == "solve":
+            result = self.service.solve(
+                int(request["year"]),
+                int(request["day"]),
+                int(request["part"]),
+                request.get("variant"),
+            )
+            return {"ok": True, **result}
+        raise ValueError(f"Unknown op: {op!r}")
+
+    def serve_until_stopped(self) -> None:
+        try:
+            while not self.stopping:
+                self.handle_request()
+        finally:
+            self.server_close()
+            Path(self.server_address).unlink(missing_ok=True)
+
+
+def request(payload: dict[str, Any], path: str | Path = DEFAULT_SOCKET) -> dict[str, Any]:
+    """Send one request to a running server and return its response."""
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(json.dumps(payload).encode() + b"\n")
+        with sock.makefile("rb") as reply:
+            line = reply.readline()
+    if not line:
+        raise ConnectionError("Server closed the connection without replying")
+    return json.loads(line)
+
+
+def solve(
+    year: int, day: int, part: int, variant: str | None = None, path: str | Path = DEFAULT_SOCKET
+) -> dict[str, Any]:
+    """Ask a running server to solve a part; raise ``RuntimeError`` if it failed.
+
+    Returns the server's response, with ``answer``, ``cached`` and ``seconds``.
+    """
+
+    response = request(
+        {"op": "solve", "year": year, "day": day, "part": part, "variant": variant}, path
+    )
+    if not response.get("ok"):
+        raise RuntimeError(response.get("error", "unknown error"))
+    return response
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--socket", type=Path, default=DEFAULT_SOCKET, help="socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("serve", help="preload every day and serve requests")
+    solve_cmd = commands.add_parser("solve", help="ask a running server for an answer")
+    solve_cmd.add_argument("year", type=int)
+    solve_cmd.add_argument("day", type=int)
+    solve_cmd.add_argument("part", type=int, choices=(1, 2))
+    solve_cmd.add_argument("--variant", help="input variant, e.g. sample")
+    commands.add_parser("ping", help="check that a server is running")
+    commands.add_parser("stop", help="stop a running server")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        service = SolverService()
+        days = service.preload()
+        server = SolverServer(args.socket, service)
+        print(f"Serving {len(days)} days on {args.socket}", flush=True)
+        server.serve_until_stopped()
+    elif args.command == "solve":
+        try:
+            response = solve(args.year, args.day, args.part, args.variant, args.socket)
+        except RuntimeError as exc:
+            raise SystemExit(str(exc)) from None
+        note = " (cached)" if response["cached"] else ""
+        print(f"{response['answer']}  [{response['seconds'] * 1000:.1f} ms{note}]")
+    else:
+        response = request({"op": args.command}, args.socket)
+        if not response.get("ok"):
+            raise SystemExit(response.get("error"))
+        if args.command == "ping":
+            print(f"Server has {len(response['days'])} days loaded")
+
+
+if __name__ == "__main__":
+    main()
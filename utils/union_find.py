@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from array import array
+from typing import Iterable, Sequence
+
+
+def top_sizes(histogram: dict[int, int], k: int) -> list[int]:
+    """Return the ``k`` largest sizes (descending) from a ``size -> count`` histogram."""
+
+    out: list[int] = []
+    for size in sorted(histogram, reverse=True):
+        if len(out) >= k:
+            break
+        out.extend([size] * min(histogram[size], k - len(out)))
+    return out
+
+
+def _as_list(values: Iterable[int]) -> Sequence[int]:
+    # NumPy arrays and array.array both offer a fast conversion to Python ints.
+    tolist = getattr(values, "tolist", None)
+    return tolist() if tolist is not None else list(values)
+
+
+class DisjointSet:
+    """Union-find over ``0..n-1`` with union by size.
+
+    Parents and sizes live in compact ``array('i')`` buffers. The number of
+    components and a histogram of component sizes are updated on every merge,
+    so ``components`` and ``largest_sizes`` never rescan the elements.
+
+    With ``rollback=True`` path compression is disabled and merges are
+    recorded, so ``rollback`` can undo them back to an earlier ``snapshot``.
+    """
+
+    def __init__(self, n: int, rollback: bool = False):
+        if n < 0:
+            raise ValueError("Element count cannot be negative")
+        self.parent = array("i", range(n))
+        self.size = array("i", [1]) * n
+        self.components = n
+        self._histogram: dict[int, int] = {1: n} if n else {}
+        self._rollback = rollback
+        self._history: list[tuple[int, int]] = []  # (absorbed root, surviving root)
+
+    def __len__(self) -> int:
+        return len(self.parent)
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        if self._rollback:
+            while parent[x] != x:
+                x = parent[x]
+            return x
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        """Merge the sets containing ``a`` and ``b``; return False if already joined."""
+
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        size = self.size
+        if size[ra] < size[rb]:
+            ra, rb = rb, ra
+        sa, sb = size[ra], size[rb]
+        self.parent[rb] = ra
+        size[ra] = sa + sb
+        self.components -= 1
+        self._count(sa, -1)
+        self._count(sb, -1)
+        self._count(sa + sb, 1)
+        if self._rollback:
+            self._history.append((rb, ra))
+        return True
+
+    def union_many(self, a: Iterable[int], b: Iterable[int]) -> int:
+        """Union ``a[k]`` with ``b[k]`` for every ``k``; return the number of merges.
+
+        Accepts lists, ``array`` buffers or NumPy integer arrays of equal length.
+        """
+
+        union = self.union
+        merges = 0
+        for x, y in zip(_as_list(a), _as_list(b), strict=True):
+            if union(x, y):
+                merges += 1
+        return merges
+
+    def connected(self, a: int, b: int) -> bool:
+        return self.find(a) == self.find(b)
+
+    def component_size(self, x: int) -> int:
+        return self.size[self.find(x)]
+
+    def size_histogram(self) -> dict[int, int]:
+        """Return a copy of the ``component size -> component count`` histogram."""
+
+        return dict(self._histogram)
+
+    def largest_sizes(self, k: int) -> list[int]:
+        """Return the ``k`` largest component sizes in descending order."""
+
+        return top_sizes(self._histogram, k)
+
+    def component_sizes(self) -> list[int]:
+        """Return every component size in descending order."""
+
+        return top_sizes(self._histogram, self.components)
+
+    def snapshot(self) -> int:
+        """Return a marker for the current state, for use with ``rollback``."""
+
+        if not self._rollback:
+            raise ValueError("Rollback is disabled for this DisjointSet")
+        return len(self._history)
+
+    def rollback(self, snapshot: int = 0) -> None:
+        """Undo merges until the structure is back at ``snapshot``."""
+
+        if not self._rollback:
+            raise ValueError("Rollback is disabled for this DisjointSet")
+        if not 0 <= snapshot <= len(self._history):
+            raise ValueError(f"Invalid snapshot: {snapshot}")
+        size = self.size
+        while len(self._history) > snapshot:
+            rb, ra = self._history.pop()
+            total, sb = size[ra], size[rb]
+            size[ra] = total - sb
+            self.parent[rb] = rb
+            self.components += 1
+            self._count(total, -1)
+            self._count(total - sb, 1)
+            self._count(sb, 1)
+
+    def _count(self, size: int, delta: int) -> None:
+        count = self._histogram.get(size, 0) + delta
+        if count:
+            self._histogram[size] = count
+        else:
+            del self._histogram[size]